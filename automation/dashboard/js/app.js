@@ -23,9 +23,7 @@ class Dashboard {
         try {
             await Promise.all([
                 this.fetchStatus(),
-                this.fetchHistory(),
-                this.fetchAnalytics(),
-                this.fetchScreenshots()
+                this.fetchDashboard()
             ]);
             
             this.updateUI();
@@ -44,30 +42,16 @@ class Dashboard {
         }
     }
     
-    async fetchHistory() {
+    async fetchDashboard() {
+        // History, analytics and screenshots are published together in one file
         try {
-            const response = await fetch('data/history.json');
-            this.history = await response.json();
+            const response = await fetch('data/dashboard.json');
+            const dashboard = await response.json();
+            this.history = dashboard.history;
+            this.analytics = dashboard.analytics;
+            this.screenshots = dashboard.screenshots;
         } catch (error) {
-            console.error('Failed to fetch history:', error);
-        }
-    }
-    
-    async fetchAnalytics() {
-        try {
-            const response = await fetch('data/analytics.json');
-            this.analytics = await response.json();
-        } catch (error) {
-            console.error('Failed to fetch analytics:', error);
-        }
-    }
-    
-    async fetchScreenshots() {
-        try {
-            const response = await fetch('data/screenshots.json');
-            this.screenshots = await response.json();
-        } catch (error) {
-            console.error('Failed to fetch screenshots:', error);
+            console.error('Failed to fetch dashboard data:', error);
         }
     }
     
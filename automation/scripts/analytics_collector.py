@@ -2,28 +2,143 @@
 Analytics collection and storage using SQLite.
 """
 
-import json
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import aiofiles
 import aiosqlite
+import orjson
+from aiosqlitepool import SQLiteConnectionPool
 
 from models import BuildError, TestFailure, PhaseResult
 from logger import get_logger
 
 
+# SQL statements are module-level constants so every call passes the same
+# string and hits the connection's prepared-statement cache
+
+# Timestamps are unix epoch milliseconds computed by SQLite itself, so write
+# paths never format a datetime and ORDER BY compares plain integers
+_NOW_MS = "CAST(ROUND((julianday('now') - 2440587.5) * 86400000) AS INTEGER)"
+
+_SQL_START_PHASE = f"""INSERT OR REPLACE INTO phases (id, module_id, name, status, started_at)
+    VALUES (?, ?, ?, 'running', {_NOW_MS})"""
+
+_SQL_COMPLETE_PHASE = f"""UPDATE phases
+    SET status = 'completed', completed_at = {_NOW_MS},
+        total_iterations = ?, total_duration_seconds = ?
+    WHERE id = ?"""
+
+_SQL_FAIL_PHASE = f"""UPDATE phases
+    SET status = 'failed', completed_at = {_NOW_MS},
+        total_iterations = ?, total_duration_seconds = ?
+    WHERE id = ?"""
+
+_SQL_INSERT_ITERATION = """INSERT INTO iterations (phase_id, iteration_number, step, status)
+    VALUES (?, ?, ?, 'running')"""
+
+_SQL_COMPLETE_ITERATION = f"""UPDATE iterations
+    SET status = 'completed', completed_at = {_NOW_MS}, duration_seconds = ?
+    WHERE phase_id = ? AND iteration_number = ? AND step = ?"""
+
+_SQL_FAIL_ITERATION = f"""UPDATE iterations
+    SET status = 'failed', completed_at = {_NOW_MS}, error_message = ?
+    WHERE phase_id = ? AND iteration_number = ? AND step = ?"""
+
+_SQL_INSERT_BUILD_ERROR = """INSERT INTO build_errors (phase_id, iteration_number, file_path, line_number, error_message)
+    VALUES (?, ?, ?, ?, ?)"""
+
+_SQL_INSERT_TEST_FAILURE = """INSERT INTO test_failures (phase_id, iteration_number, test_class, test_name, failure_message)
+    VALUES (?, ?, ?, ?, ?)"""
+
+_SQL_INSERT_RATE_LIMIT = """INSERT INTO rate_limits (phase_id, wait_seconds) VALUES (?, ?)"""
+
+_SQL_INSERT_COMMIT = """INSERT INTO commits (phase_id, commit_hash, message, files_changed)
+    VALUES (?, ?, ?, ?)"""
+
+_SQL_INSERT_SCREENSHOT = """INSERT INTO screenshots (phase_id, file_path) VALUES (?, ?)"""
+
+_SQL_INSERT_TOKEN_USAGE = """INSERT INTO token_usage (phase_id, iteration_number, input_tokens, output_tokens, model)
+    VALUES (?, ?, ?, ?, ?)"""
+
+_SQL_OVERALL_STATS = """SELECT COUNT(*) as total_phases,
+           COALESCE(SUM(status = 'completed'), 0) as completed_phases,
+           COALESCE(SUM(status = 'failed'), 0) as failed_phases,
+           COALESCE(SUM(total_duration_seconds), 0) as total_duration,
+           (SELECT COUNT(*) FROM iterations) as total_iterations,
+           (SELECT COUNT(*) FROM build_errors) as total_build_errors,
+           (SELECT COUNT(*) FROM test_failures) as total_test_failures,
+           (SELECT COUNT(*) FROM rate_limits) as total_rate_limits,
+           (SELECT COALESCE(SUM(input_tokens), 0) FROM token_usage) as total_input_tokens,
+           (SELECT COALESCE(SUM(output_tokens), 0) FROM token_usage) as total_output_tokens
+    FROM phases"""
+
+_SQL_PHASE_BY_ID = "SELECT * FROM phases WHERE id = ?"
+
+_SQL_PHASE_BUILD_ERROR_COUNT = "SELECT COUNT(*) as count FROM build_errors WHERE phase_id = ?"
+
+_SQL_PHASE_TEST_FAILURE_COUNT = "SELECT COUNT(*) as count FROM test_failures WHERE phase_id = ?"
+
+_SQL_PHASE_HISTORY = """WITH be AS (
+        SELECT phase_id, COUNT(*) as c FROM build_errors GROUP BY phase_id
+    ), tf AS (
+        SELECT phase_id, COUNT(*) as c FROM test_failures GROUP BY phase_id
+    )
+    SELECT p.*,
+           COALESCE(be.c, 0) as build_errors,
+           COALESCE(tf.c, 0) as test_failures
+    FROM phases p
+    LEFT JOIN be ON be.phase_id = p.id
+    LEFT JOIN tf ON tf.phase_id = p.id
+    ORDER BY p.started_at"""
+
+_SQL_TIMELINE = """SELECT 'phase_start' as type, id as phase_id, name, started_at as timestamp
+    FROM phases WHERE started_at IS NOT NULL
+    UNION ALL
+    SELECT CASE status WHEN 'completed' THEN 'phase_complete' ELSE 'phase_failed' END as type,
+        id as phase_id, name, completed_at as timestamp
+    FROM phases WHERE status IN ('completed', 'failed') AND completed_at IS NOT NULL
+    ORDER BY timestamp"""
+
+# Databases written before timestamps became epoch milliseconds declare these
+# columns as TIMESTAMP text. Python-written values were local-time ISO strings;
+# column defaults came from CURRENT_TIMESTAMP, which is UTC.
+_LEGACY_LOCAL_TIME_COLUMNS = {
+    "phases": ("started_at", "completed_at"),
+    "iterations": ("started_at", "completed_at"),
+}
+_LEGACY_UTC_COLUMNS = {
+    "build_errors": ("timestamp",),
+    "test_failures": ("timestamp",),
+    "rate_limits": ("timestamp",),
+    "commits": ("timestamp",),
+    "screenshots": ("timestamp",),
+    "token_usage": ("timestamp",),
+}
+_LEGACY_TABLES = (*_LEGACY_LOCAL_TIME_COLUMNS, *_LEGACY_UTC_COLUMNS)
+
+
+def _epoch_ms_expr(column: str, local_time: bool) -> str:
+    """SQL converting a legacy ISO text value to epoch milliseconds (other values pass through)."""
+    modifier = ", 'utc'" if local_time else ""
+    return (f"CASE WHEN typeof({column}) = 'text' "
+            f"THEN CAST(ROUND((julianday({column}{modifier}) - 2440587.5) * 86400000) AS INTEGER) "
+            f"ELSE {column} END")
+
+
 class AnalyticsCollector:
     """Collects and stores analytics in SQLite."""
     
-    SCHEMA = """
+    SCHEMA = f"""
     CREATE TABLE IF NOT EXISTS phases (
         id TEXT PRIMARY KEY,
         module_id TEXT,
         name TEXT,
         status TEXT,
-        started_at TIMESTAMP,
-        completed_at TIMESTAMP,
+        started_at INTEGER,
+        completed_at INTEGER,
         total_iterations INTEGER DEFAULT 0,
         total_duration_seconds REAL DEFAULT 0
     );
@@ -34,8 +149,8 @@ class AnalyticsCollector:
         iteration_number INTEGER,
         step TEXT,
         status TEXT,
-        started_at TIMESTAMP,
-        completed_at TIMESTAMP,
+        started_at INTEGER DEFAULT ({_NOW_MS}),
+        completed_at INTEGER,
         duration_seconds REAL,
         error_message TEXT,
         FOREIGN KEY (phase_id) REFERENCES phases(id)
@@ -48,7 +163,7 @@ class AnalyticsCollector:
         file_path TEXT,
         line_number INTEGER,
         error_message TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp INTEGER DEFAULT ({_NOW_MS}),
         FOREIGN KEY (phase_id) REFERENCES phases(id)
     );
     
@@ -59,14 +174,14 @@ class AnalyticsCollector:
         test_class TEXT,
         test_name TEXT,
         failure_message TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp INTEGER DEFAULT ({_NOW_MS}),
         FOREIGN KEY (phase_id) REFERENCES phases(id)
     );
     
     CREATE TABLE IF NOT EXISTS rate_limits (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         phase_id TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp INTEGER DEFAULT ({_NOW_MS}),
         wait_seconds INTEGER
     );
     
@@ -76,7 +191,7 @@ class AnalyticsCollector:
         commit_hash TEXT,
         message TEXT,
         files_changed INTEGER DEFAULT 0,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp INTEGER DEFAULT ({_NOW_MS}),
         FOREIGN KEY (phase_id) REFERENCES phases(id)
     );
     
@@ -84,7 +199,7 @@ class AnalyticsCollector:
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         phase_id TEXT,
         file_path TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp INTEGER DEFAULT ({_NOW_MS}),
         FOREIGN KEY (phase_id) REFERENCES phases(id)
     );
     
@@ -95,206 +210,359 @@ class AnalyticsCollector:
         input_tokens INTEGER DEFAULT 0,
         output_tokens INTEGER DEFAULT 0,
         model TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp INTEGER DEFAULT ({_NOW_MS}),
         FOREIGN KEY (phase_id) REFERENCES phases(id)
     );
     
+    CREATE INDEX IF NOT EXISTS idx_phases_started ON phases(started_at);
+    CREATE INDEX IF NOT EXISTS idx_phases_completed ON phases(completed_at);
     CREATE INDEX IF NOT EXISTS idx_iterations_phase ON iterations(phase_id);
+    CREATE INDEX IF NOT EXISTS idx_iterations_phase_iter_step ON iterations(phase_id, iteration_number, step);
     CREATE INDEX IF NOT EXISTS idx_build_errors_phase ON build_errors(phase_id);
     CREATE INDEX IF NOT EXISTS idx_test_failures_phase ON test_failures(phase_id);
     """
     
-    def __init__(self, db_path: str):
+    # Layout settings that only take effect on an empty database, so they are
+    # applied before journal_mode=WAL on the first connection to a new file
+    CREATE_PRAGMAS = """
+    PRAGMA page_size=8192;
+    PRAGMA auto_vacuum=INCREMENTAL;
+    """
+    
+    # Applied to every pooled connection when it is opened
+    PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA wal_autocheckpoint=1000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+    """
+    
+    # Write-behind queue: max events per transaction, and how long the writer
+    # lingers after the first event so closely spaced events share a commit
+    WRITE_BATCH_MAX = 256
+    WRITE_LINGER_SECONDS = 0.05
+    
+    # Background maintenance cadence (passive WAL checkpoint and incremental
+    # vacuum of up to VACUUM_PAGES free pages)
+    CHECKPOINT_INTERVAL_SECONDS = 30
+    VACUUM_PAGES = 1000
+    
+    # Stored in PRAGMA user_version; 1 = epoch-millisecond timestamp columns
+    SCHEMA_VERSION = 1
+    
+    def __init__(self, db_path: str, pool_size: int = 4):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._is_new_db = not self.db_path.exists()
         self.logger = get_logger()
+        
+        self.pool = SQLiteConnectionPool(self._make_conn, pool_size=pool_size)
+        
+        self._write_queue: asyncio.Queue[tuple[str, list[tuple]]] = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._checkpoint_task: Optional[asyncio.Task] = None
+    
+    async def _make_conn(self) -> aiosqlite.Connection:
+        """Open a new connection for the pool."""
+        conn = await aiosqlite.connect(self.db_path, cached_statements=256)
+        script = self.PRAGMAS
+        if self._is_new_db:
+            self._is_new_db = False
+            script = self.CREATE_PRAGMAS + script
+        await conn.executescript(script)
+        conn.row_factory = aiosqlite.Row
+        return conn
     
     async def initialize_db(self):
         """Initialize database with schema."""
-        async with aiosqlite.connect(self.db_path) as db:
+        # executescript() runs in autocommit mode, so the DDL needs no commit
+        async with self.pool.connection() as db:
+            cursor = await db.execute("PRAGMA user_version")
+            (version,) = await cursor.fetchone()
+            if version < self.SCHEMA_VERSION and await self._has_legacy_timestamps(db):
+                await self._migrate_legacy_timestamps(db)
             await db.executescript(self.SCHEMA)
-            await db.commit()
+            await db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        
+        if self._checkpoint_task is None:
+            self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+        
         self.logger.debug("Analytics database initialized")
     
+    @staticmethod
+    async def _has_legacy_timestamps(db: aiosqlite.Connection) -> bool:
+        """Whether the phases table still declares TIMESTAMP text columns."""
+        cursor = await db.execute(
+            "SELECT type FROM pragma_table_info('phases') WHERE name = 'started_at'"
+        )
+        row = await cursor.fetchone()
+        return row is not None and row[0].upper() == "TIMESTAMP"
+    
+    async def _migrate_legacy_timestamps(self, db: aiosqlite.Connection):
+        """Rebuild tables from a pre-epoch-ms database, converting ISO timestamps."""
+        self.logger.info("Migrating analytics database timestamps to epoch milliseconds")
+        
+        legacy_columns: dict[str, list[str]] = {}
+        for table in _LEGACY_TABLES:
+            cursor = await db.execute("SELECT name FROM pragma_table_info(?)", (table,))
+            columns = [row[0] for row in await cursor.fetchall()]
+            if columns:
+                legacy_columns[table] = columns
+        
+        # Explicit indexes keep their names when a table is renamed, so drop them
+        # before SCHEMA recreates them on the new tables
+        placeholders = ", ".join("?" * len(legacy_columns))
+        cursor = await db.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({placeholders})",
+            tuple(legacy_columns)
+        )
+        indexes = [row[0] for row in await cursor.fetchall()]
+        
+        statements = ["BEGIN"]
+        statements.extend(f"DROP INDEX {index}" for index in indexes)
+        statements.extend(f"ALTER TABLE {table} RENAME TO {table}_legacy" for table in legacy_columns)
+        statements.append(self.SCHEMA)
+        for table, columns in legacy_columns.items():
+            local = _LEGACY_LOCAL_TIME_COLUMNS.get(table, ())
+            utc = _LEGACY_UTC_COLUMNS.get(table, ())
+            select = ", ".join(
+                _epoch_ms_expr(c, c in local) if c in local or c in utc else c
+                for c in columns
+            )
+            statements.append(
+                f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select} FROM {table}_legacy"
+            )
+            statements.append(f"DROP TABLE {table}_legacy")
+        statements.append("COMMIT")
+        
+        await db.executescript(";\n".join(statements))
+    
+    async def aclose(self):
+        """Flush queued writes and close all pooled connections."""
+        await self.flush()
+        for task in (self._writer_task, self._checkpoint_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._writer_task = None
+        self._checkpoint_task = None
+        
+        # Refresh planner statistics before closing
+        try:
+            async with self.pool.connection() as db:
+                await db.execute("PRAGMA optimize")
+        except Exception as e:
+            self.logger.debug(f"PRAGMA optimize failed: {e}")
+        
+        await self.pool.close()
+    
+    # Write-behind queue
+    
+    def _enqueue(self, sql: str, rows: list[tuple]):
+        """Queue rows for the background writer, starting it if needed."""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._drain_writes())
+        self._write_queue.put_nowait((sql, rows))
+    
+    async def _drain_writes(self):
+        """Commit queued events in batches, one transaction per batch."""
+        while True:
+            batch = [await self._write_queue.get()]
+            await asyncio.sleep(self.WRITE_LINGER_SECONDS)
+            while len(batch) < self.WRITE_BATCH_MAX and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            
+            try:
+                await self._write_batch(batch)
+            except Exception as e:
+                self.logger.error(f"Failed to write analytics batch: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    async def _write_batch(self, batch: list[tuple[str, list[tuple]]]):
+        """Write a batch in one transaction, falling back to one event per transaction."""
+        async with self.pool.connection() as db:
+            try:
+                await self._execute_events(db, batch)
+                await db.commit()
+                return
+            except Exception as e:
+                # Never hand a half-applied transaction back to the pool
+                await db.rollback()
+                if len(batch) == 1:
+                    raise
+                self.logger.warning(f"Analytics batch failed ({e}), writing events individually")
+            
+            # Isolate the bad event so the rest of the batch is still stored
+            for event in batch:
+                try:
+                    await self._execute_events(db, [event])
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    self.logger.error(f"Failed to write analytics event: {e}")
+    
+    @staticmethod
+    async def _execute_events(db: aiosqlite.Connection, batch: list[tuple[str, list[tuple]]]):
+        """Execute events, merging consecutive ones that share a statement."""
+        # Only adjacent events are merged so queue order is preserved
+        # (an iteration UPDATE must never run before its INSERT)
+        sql, rows = batch[0][0], list(batch[0][1])
+        for next_sql, next_rows in batch[1:]:
+            if next_sql == sql:
+                rows.extend(next_rows)
+            else:
+                await db.executemany(sql, rows)
+                sql, rows = next_sql, list(next_rows)
+        await db.executemany(sql, rows)
+    
+    async def _checkpoint_loop(self):
+        """Periodically fold the WAL back into the database and reclaim free pages."""
+        while True:
+            await asyncio.sleep(self.CHECKPOINT_INTERVAL_SECONDS)
+            try:
+                async with self.pool.connection() as db:
+                    await db.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                    cursor = await db.execute(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES})")
+                    await cursor.fetchall()
+            except Exception as e:
+                self.logger.debug(f"Analytics maintenance failed: {e}")
+    
+    async def flush(self):
+        """Wait until all queued writes are committed."""
+        await self._write_queue.join()
+    
     # Phase tracking
     
     async def start_phase(self, phase_id: str, module_id: str, name: str):
         """Record phase start."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.connection() as db:
             await db.execute(
-                """INSERT OR REPLACE INTO phases (id, module_id, name, status, started_at)
-                   VALUES (?, ?, ?, 'running', ?)""",
-                (phase_id, module_id, name, datetime.now().isoformat())
+                _SQL_START_PHASE,
+                (phase_id, module_id, name)
             )
             await db.commit()
     
     async def complete_phase(self, phase_id: str, iterations: int, duration: float):
-        """Record phase completion."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """UPDATE phases 
-                   SET status = 'completed', completed_at = ?, 
-                       total_iterations = ?, total_duration_seconds = ?
-                   WHERE id = ?""",
-                (datetime.now().isoformat(), iterations, duration, phase_id)
-            )
-            await db.commit()
+        """Record phase completion, committing it with the phase's queued events."""
+        self._enqueue(_SQL_COMPLETE_PHASE, [(iterations, duration, phase_id)])
+        await self.flush()
     
     async def fail_phase(self, phase_id: str, iterations: int, duration: float):
-        """Record phase failure."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """UPDATE phases 
-                   SET status = 'failed', completed_at = ?, 
-                       total_iterations = ?, total_duration_seconds = ?
-                   WHERE id = ?""",
-                (datetime.now().isoformat(), iterations, duration, phase_id)
-            )
-            await db.commit()
+        """Record phase failure, committing it with the phase's queued events."""
+        self._enqueue(_SQL_FAIL_PHASE, [(iterations, duration, phase_id)])
+        await self.flush()
     
     # Iteration tracking
     
     async def record_iteration_start(self, phase_id: str, iteration: int, step: str):
         """Record iteration start."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """INSERT INTO iterations (phase_id, iteration_number, step, status, started_at)
-                   VALUES (?, ?, ?, 'running', ?)""",
-                (phase_id, iteration, step, datetime.now().isoformat())
-            )
-            await db.commit()
+        self._enqueue(
+            _SQL_INSERT_ITERATION,
+            [(phase_id, iteration, step)]
+        )
     
     async def record_iteration_complete(self, phase_id: str, iteration: int, step: str, duration: float):
         """Record iteration completion."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """UPDATE iterations 
-                   SET status = 'completed', completed_at = ?, duration_seconds = ?
-                   WHERE phase_id = ? AND iteration_number = ? AND step = ?""",
-                (datetime.now().isoformat(), duration, phase_id, iteration, step)
-            )
-            await db.commit()
+        self._enqueue(
+            _SQL_COMPLETE_ITERATION,
+            [(duration, phase_id, iteration, step)]
+        )
     
     async def record_iteration_failed(self, phase_id: str, iteration: int, step: str, error: str):
         """Record iteration failure."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """UPDATE iterations 
-                   SET status = 'failed', completed_at = ?, error_message = ?
-                   WHERE phase_id = ? AND iteration_number = ? AND step = ?""",
-                (datetime.now().isoformat(), error, phase_id, iteration, step)
-            )
-            await db.commit()
+        self._enqueue(
+            _SQL_FAIL_ITERATION,
+            [(error, phase_id, iteration, step)]
+        )
     
     # Error tracking
     
     async def record_build_errors(self, phase_id: str, iteration: int, errors: list[BuildError]):
         """Record build errors."""
-        async with aiosqlite.connect(self.db_path) as db:
-            for error in errors:
-                await db.execute(
-                    """INSERT INTO build_errors (phase_id, iteration_number, file_path, line_number, error_message)
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (phase_id, iteration, error.file_path, error.line_number, error.message)
-                )
-            await db.commit()
+        if not errors:
+            return
+        
+        rows = [(phase_id, iteration, e.file_path, e.line_number, e.message) for e in errors]
+        
+        self._enqueue(
+            _SQL_INSERT_BUILD_ERROR,
+            rows
+        )
     
     async def record_test_failures(self, phase_id: str, iteration: int, failures: list[TestFailure]):
         """Record test failures."""
-        async with aiosqlite.connect(self.db_path) as db:
-            for failure in failures:
-                await db.execute(
-                    """INSERT INTO test_failures (phase_id, iteration_number, test_class, test_name, failure_message)
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (phase_id, iteration, failure.test_class, failure.test_name, failure.failure_message)
-                )
-            await db.commit()
+        if not failures:
+            return
+        
+        rows = [(phase_id, iteration, f.test_class, f.test_name, f.failure_message) for f in failures]
+        
+        self._enqueue(
+            _SQL_INSERT_TEST_FAILURE,
+            rows
+        )
     
     # Other events
     
     async def record_rate_limit(self, phase_id: str, wait_seconds: int):
         """Record rate limit hit."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """INSERT INTO rate_limits (phase_id, wait_seconds) VALUES (?, ?)""",
-                (phase_id, wait_seconds)
-            )
-            await db.commit()
+        self._enqueue(
+            _SQL_INSERT_RATE_LIMIT,
+            [(phase_id, wait_seconds)]
+        )
     
     async def record_commit(self, phase_id: str, commit_hash: str, message: str, files_changed: int = 0):
         """Record git commit."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """INSERT INTO commits (phase_id, commit_hash, message, files_changed)
-                   VALUES (?, ?, ?, ?)""",
-                (phase_id, commit_hash, message, files_changed)
-            )
-            await db.commit()
+        self._enqueue(
+            _SQL_INSERT_COMMIT,
+            [(phase_id, commit_hash, message, files_changed)]
+        )
     
     async def record_screenshot(self, phase_id: str, file_path: str):
         """Record screenshot capture."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """INSERT INTO screenshots (phase_id, file_path) VALUES (?, ?)""",
-                (phase_id, file_path)
-            )
-            await db.commit()
+        self._enqueue(
+            _SQL_INSERT_SCREENSHOT,
+            [(phase_id, file_path)]
+        )
     
     async def record_token_usage(self, phase_id: str, iteration: int, 
                                   input_tokens: int, output_tokens: int, model: str):
         """Record token usage."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """INSERT INTO token_usage (phase_id, iteration_number, input_tokens, output_tokens, model)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (phase_id, iteration, input_tokens, output_tokens, model)
-            )
-            await db.commit()
+        self._enqueue(
+            _SQL_INSERT_TOKEN_USAGE,
+            [(phase_id, iteration, input_tokens, output_tokens, model)]
+        )
     
     # Statistics queries
     
     async def get_overall_stats(self) -> dict:
         """Get overall statistics."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
-            # Phase counts
-            cursor = await db.execute("SELECT COUNT(*) as total FROM phases")
-            total_phases = (await cursor.fetchone())["total"]
-            
-            cursor = await db.execute("SELECT COUNT(*) as completed FROM phases WHERE status = 'completed'")
-            completed_phases = (await cursor.fetchone())["completed"]
-            
-            cursor = await db.execute("SELECT COUNT(*) as failed FROM phases WHERE status = 'failed'")
-            failed_phases = (await cursor.fetchone())["failed"]
-            
-            # Iteration counts
-            cursor = await db.execute("SELECT COUNT(*) as total FROM iterations")
-            total_iterations = (await cursor.fetchone())["total"]
-            
-            # Error counts
-            cursor = await db.execute("SELECT COUNT(*) as total FROM build_errors")
-            total_build_errors = (await cursor.fetchone())["total"]
-            
-            cursor = await db.execute("SELECT COUNT(*) as total FROM test_failures")
-            total_test_failures = (await cursor.fetchone())["total"]
-            
-            # Rate limits
-            cursor = await db.execute("SELECT COUNT(*) as total FROM rate_limits")
-            total_rate_limits = (await cursor.fetchone())["total"]
-            
-            # Total duration
-            cursor = await db.execute("SELECT SUM(total_duration_seconds) as total FROM phases")
+        await self.flush()
+        
+        # One round-trip: conditional aggregates over phases plus scalar
+        # subqueries for the event tables
+        async with self.pool.connection() as db:
+            cursor = await db.execute(_SQL_OVERALL_STATS)
             row = await cursor.fetchone()
-            total_duration = row["total"] if row["total"] else 0
             
-            # Token usage
-            cursor = await db.execute(
-                "SELECT SUM(input_tokens) as input, SUM(output_tokens) as output FROM token_usage"
-            )
-            row = await cursor.fetchone()
-            total_input_tokens = row["input"] if row["input"] else 0
-            total_output_tokens = row["output"] if row["output"] else 0
+            total_phases = row["total_phases"]
+            completed_phases = row["completed_phases"]
+            failed_phases = row["failed_phases"]
+            total_iterations = row["total_iterations"]
+            total_build_errors = row["total_build_errors"]
+            total_test_failures = row["total_test_failures"]
+            total_rate_limits = row["total_rate_limits"]
+            total_duration = row["total_duration"]
+            total_input_tokens = row["total_input_tokens"]
+            total_output_tokens = row["total_output_tokens"]
             
             return {
                 "total_phases": total_phases,
@@ -314,23 +582,19 @@ class AnalyticsCollector:
     
     async def get_phase_stats(self, phase_id: str) -> dict:
         """Get statistics for a specific phase."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
-            cursor = await db.execute("SELECT * FROM phases WHERE id = ?", (phase_id,))
+        await self.flush()
+        
+        async with self.pool.connection() as db:
+            cursor = await db.execute(_SQL_PHASE_BY_ID, (phase_id,))
             phase = await cursor.fetchone()
             
             if not phase:
                 return {}
             
-            cursor = await db.execute(
-                "SELECT COUNT(*) as count FROM build_errors WHERE phase_id = ?", (phase_id,)
-            )
+            cursor = await db.execute(_SQL_PHASE_BUILD_ERROR_COUNT, (phase_id,))
             build_errors = (await cursor.fetchone())["count"]
             
-            cursor = await db.execute(
-                "SELECT COUNT(*) as count FROM test_failures WHERE phase_id = ?", (phase_id,)
-            )
+            cursor = await db.execute(_SQL_PHASE_TEST_FAILURE_COUNT, (phase_id,))
             test_failures = (await cursor.fetchone())["count"]
             
             return {
@@ -345,55 +609,56 @@ class AnalyticsCollector:
     
     async def get_phase_history(self) -> list[dict]:
         """Get history of all phases."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
-            cursor = await db.execute(
-                """SELECT p.*, 
-                          (SELECT COUNT(*) FROM build_errors WHERE phase_id = p.id) as build_errors,
-                          (SELECT COUNT(*) FROM test_failures WHERE phase_id = p.id) as test_failures
-                   FROM phases p
-                   ORDER BY p.started_at"""
-            )
+        await self.flush()
+        
+        async with self.pool.connection() as db:
+            cursor = await db.execute(_SQL_PHASE_HISTORY)
             rows = await cursor.fetchall()
             
             return [dict(row) for row in rows]
     
     async def get_timeline(self) -> list[dict]:
         """Get timeline of events."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            
+        async with self.pool.connection() as db:
             events = []
             
             # Phase events
-            cursor = await db.execute(
-                """SELECT 'phase_start' as type, id as phase_id, name, started_at as timestamp
-                   FROM phases WHERE started_at IS NOT NULL
-                   UNION ALL
-                   SELECT 'phase_complete' as type, id as phase_id, name, completed_at as timestamp
-                   FROM phases WHERE status = 'completed' AND completed_at IS NOT NULL
-                   UNION ALL
-                   SELECT 'phase_failed' as type, id as phase_id, name, completed_at as timestamp
-                   FROM phases WHERE status = 'failed' AND completed_at IS NOT NULL
-                   ORDER BY timestamp"""
-            )
+            cursor = await db.execute(_SQL_TIMELINE)
             
             rows = await cursor.fetchall()
             events.extend([dict(row) for row in rows])
             
             return events
     
+    # Rows encoded per file write while exporting
+    EXPORT_BATCH_ROWS = 500
+    
     async def export_to_json(self, output_path: Path):
-        """Export all analytics to JSON."""
-        data = {
-            "exported_at": datetime.now().isoformat(),
-            "overall": await self.get_overall_stats(),
-            "phases": await self.get_phase_history(),
-            "timeline": await self.get_timeline()
-        }
+        """Export all analytics to JSON, streaming rows to disk off the event loop."""
+        overall = await self.get_overall_stats()
         
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2)
+        async with aiofiles.open(output_path, "wb") as f:
+            await f.write(
+                b'{"exported_at":' + orjson.dumps(datetime.now().isoformat())
+                + b',"overall":' + orjson.dumps(overall)
+            )
+            
+            async with self.pool.connection() as db:
+                await f.write(b',"phases":')
+                await self._stream_rows(db, _SQL_PHASE_HISTORY, f)
+                await f.write(b',"timeline":')
+                await self._stream_rows(db, _SQL_TIMELINE, f)
+            
+            await f.write(b"}")
         
         self.logger.debug(f"Analytics exported to {output_path}")
+    
+    @classmethod
+    async def _stream_rows(cls, db: aiosqlite.Connection, sql: str, f):
+        """Write a query's rows to f as a JSON array, one batch of rows per write."""
+        separator = b"["
+        async with db.execute(sql) as cursor:
+            while rows := await cursor.fetchmany(cls.EXPORT_BATCH_ROWS):
+                await f.write(separator + b",".join(orjson.dumps(dict(row)) for row in rows))
+                separator = b","
+        await f.write(b"[]" if separator == b"[" else b"]")
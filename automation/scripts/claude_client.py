@@ -3,19 +3,106 @@ Claude API/CLI client for code generation.
 """
 
 import asyncio
+import codecs
 import json
 import os
 import re
+import shutil
 import tempfile
 import time
 import uuid
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
 from models import ClaudeResponse, FileChange
 from logger import get_logger
 
+# RE2 matches in linear time without backtracking; fall back to the stdlib
+# engine when google-re2 isn't installed. Patterns below use inline flags so
+# they compile the same way under either module.
+try:
+    import re2 as _file_re
+except ImportError:
+    _file_re = re
+
+
+# File markers that precede a code block in Claude's response:
+#   ### path/to/file.swift
+#   **path/to/file.swift**
+#   File: path/to/file.swift
+#   `path/to/file.swift`
+# Each alternative has exactly one group, so match.lastindex is the filename.
+_FILE_NAME = r'([\w/\-\.]+\.(?:swift|md|yaml|json|txt|py))'
+_FILE_MARKER_RE = _file_re.compile(
+    rf'(?m)###\s+{_FILE_NAME}'
+    rf'|\*\*{_FILE_NAME}\*\*'
+    rf'|File:\s*{_FILE_NAME}'
+    rf'|`{_FILE_NAME}`'
+)
+_CODE_BLOCK_RE = _file_re.compile(r'(?s)```(?:\w+)?\n(.*?)```')
+
+# Chunk size for reading Claude CLI stdout, and how many reads between
+# progress log lines
+_READ_CHUNK_SIZE = 65536
+_PROGRESS_EVERY_CHUNKS = 16
+
+
+class _FileChangeStream:
+    """
+    Incremental version of ClaudeClient._extract_file_changes.
+    
+    Text is fed in as it arrives. Only complete lines are scanned, and a
+    marker is resolved as soon as its code block closes or the next marker
+    appears, after which the text before that point is discarded.
+    """
+    
+    def __init__(self):
+        self.files: list[FileChange] = []
+        self.chars_received = 0
+        self._window = ""
+    
+    def feed(self, text: str):
+        """Add streamed text and resolve any markers it completes."""
+        self.chars_received += len(text)
+        self._window += text
+        self._resolve(self._window.rfind("\n") + 1)
+    
+    def finish(self) -> list[FileChange]:
+        """Resolve whatever is left once the stream has ended."""
+        self._resolve(len(self._window))
+        self._window = ""
+        return self.files
+    
+    def _resolve(self, region_end: int):
+        window = self._window
+        markers = list(_FILE_MARKER_RE.finditer(window, 0, region_end))
+        if not markers:
+            # A marker's whitespace can run across line breaks ("###\nfile.md"),
+            # so keep the last non-blank line in case it begins one
+            content_end = len(window[:region_end].rstrip())
+            self._window = window[window.rfind("\n", 0, content_end) + 1:]
+            return
+        
+        for i, marker in enumerate(markers):
+            next_start = markers[i + 1].start() if i + 1 < len(markers) else region_end
+            code_match = _CODE_BLOCK_RE.search(window, marker.end(), next_start)
+            if code_match:
+                self.files.append(FileChange(
+                    path=marker.group(marker.lastindex),
+                    content=code_match.group(1).strip(),
+                    action="create"
+                ))
+                consumed = code_match.end()
+            elif i + 1 < len(markers):
+                consumed = next_start
+            else:
+                # Last marker's block hasn't arrived yet
+                consumed = marker.start()
+        
+        self._window = window[consumed:]
+
 
 class RateLimitError(Exception):
     """Raised when Claude API rate limit is hit."""
@@ -27,6 +114,51 @@ class RateLimitError(Exception):
 class ClaudeClient:
     """Client for interacting with Claude via CLI or API."""
     
+    # Responses larger than this are parsed in a worker thread so the regex
+    # scan doesn't stall the event loop
+    PARSE_OFFLOAD_THRESHOLD = 16384
+    
+    # Rate limit reset messages, compiled once
+    # "You've hit your limit · resets Jan 10 at 9:30am (Asia/Calcutta)"
+    _RESET_DATE_RE = re.compile(
+        r'resets?\s+([a-z]{3})\s+(\d{1,2})\s+(?:at\s+)?(\d{1,2}):(\d{2})(am|pm)', re.IGNORECASE | re.ASCII
+    )
+    # "You've hit your limit · resets 9:30am (Asia/Calcutta)"
+    _RESET_TIME_RE = re.compile(r'resets?\s+(\d{1,2}):(\d{2})(am|pm)', re.IGNORECASE | re.ASCII)
+    # Common patterns for rate limit reset time
+    _RETRY_PATTERNS = [
+        re.compile(p, re.IGNORECASE | re.ASCII) for p in (
+            r'retry.?after[:\s]+(\d+)',
+            r'wait[:\s]+(\d+)\s*second',
+            r'(\d+)\s*seconds?\s*(?:before|until)',
+            r'try again in (\d+)\s*(?:second|minute|hour)',
+            r'reset(?:s|ting)?\s*(?:in|after)\s*(\d+)',
+            r'limit.*?(\d+)\s*(?:second|minute)',
+            r'please wait (\d+)',
+            r'available in (\d+)',
+        )
+    ]
+    _MONTHS = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+               'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+    
+    # Substrings that mark CLI/API output as a rate limit, matched in one pass
+    _RATE_LIMIT_INDICATORS = (
+        'rate limit',
+        'rate_limit',
+        'too many requests',
+        'quota exceeded',
+        'throttl',
+        'overloaded',
+        'capacity',
+        '429',
+        'try again later',
+        'request limit',
+        'hit your limit',
+        "you've hit",
+        'resets',
+    )
+    _RATE_LIMIT_RE = re.compile('|'.join(map(re.escape, _RATE_LIMIT_INDICATORS)), re.IGNORECASE | re.ASCII)
+    
     def __init__(self, config: dict):
         self.config = config
         self.claude_config = config.get("claude", {})
@@ -39,10 +171,57 @@ class ClaudeClient:
         self.logger = get_logger()
         self._api_client = None
         
+        # The SDK is only imported for API mode; CLI-only runs never load it.
+        # A missing install is reported on the first API call, not here, so
+        # status commands can still construct the client.
+        self._anthropic = None
+        if not self.use_cli:
+            try:
+                import anthropic
+            except ImportError:
+                pass
+            else:
+                self._anthropic = anthropic
+        self._available: Optional[bool] = None
+        
+        # Resolved once so each CLI spawn skips the PATH search and path checks
+        self._claude_path: Optional[str] = None
+        self._project_root: Optional[Path] = None
+        
+        # Proactive sliding-window throttle (0 disables a limit)
+        self.rpm_limit = self.claude_config.get("rpm_limit", 0)
+        self.tpm_limit = self.claude_config.get("tpm_limit", 0)
+        self._req_times: deque[float] = deque()
+        self._tok_times: deque[tuple[float, int]] = deque()
+        self._window_tokens = 0
+        
+        # Set from API rate-limit headers when the remaining request budget is low
+        self._preemptive_pause_until = 0.0
+        
+        # AIMD limit on in-flight requests: +0.5 per call that finishes under
+        # the latency target, halved on a rate limit or a slow call
+        self._concurrency = float(self.claude_config.get("initial_concurrency", 2))
+        self.max_concurrency = self.claude_config.get("max_concurrency", 8)
+        self.latency_target = self.claude_config.get("latency_target_seconds", 300)
+        self._in_flight = 0
+        self._slot_freed = asyncio.Condition()
+        
         # Session management for CLI mode
         self._session_id: Optional[str] = None
         self._session_started: bool = False
     
+    async def __aenter__(self) -> "ClaudeClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the API client and its HTTP connection pool."""
+        if self._api_client is not None:
+            await self._api_client.close()
+            self._api_client = None
+    
     def start_session(self, session_id: str = None) -> str:
         """
         Start a new Claude session.
@@ -80,56 +259,144 @@ class ClaudeClient:
         Returns:
             ClaudeResponse with generated content
         """
-        if self.use_cli:
-            return await self._send_via_cli(prompt, context)
+        pause = self._preemptive_pause_until - time.monotonic()
+        if pause > 0:
+            self.logger.info(f"Pausing {pause:.0f}s before next Claude request (API rate limit nearly exhausted)")
+            await asyncio.sleep(pause)
+        
+        await self._wait_if_throttled(len(prompt) // 4 + (len(context) // 4 if context else 0))
+        await self._acquire_slot()
+        
+        start = time.monotonic()
+        rate_limited = False
+        try:
+            if self.use_cli:
+                return await self._send_via_cli(prompt, context)
+            else:
+                return await self._send_via_api(prompt, context)
+        except RateLimitError:
+            rate_limited = True
+            raise
+        finally:
+            await self._release_slot(time.monotonic() - start, rate_limited)
+    
+    async def _acquire_slot(self):
+        """Wait for an in-flight slot under the current concurrency limit."""
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(lambda: self._in_flight < int(self._concurrency))
+            self._in_flight += 1
+    
+    async def _release_slot(self, elapsed: float, rate_limited: bool):
+        """Free a slot and adjust the concurrency limit from the call's outcome."""
+        if rate_limited or elapsed > self.latency_target:
+            self._concurrency = max(1.0, float(int(self._concurrency * 0.5)))
+        else:
+            self._concurrency = min(float(self.max_concurrency), self._concurrency + 0.5)
+        self.logger.debug(f"Claude concurrency limit now {int(self._concurrency)}")
+        
+        async with self._slot_freed:
+            self._in_flight -= 1
+            self._slot_freed.notify_all()
+    
+    async def _wait_if_throttled(self, est_tokens: int):
+        """
+        Wait until the last minute's requests and estimated input tokens
+        leave room for another call under rpm_limit / tpm_limit.
+        
+        Args:
+            est_tokens: Estimated input tokens for the upcoming request
+        """
+        window = 60.0
+        while True:
+            now = time.monotonic()
+            while self._req_times and now - self._req_times[0] >= window:
+                self._req_times.popleft()
+            while self._tok_times and now - self._tok_times[0][0] >= window:
+                self._window_tokens -= self._tok_times.popleft()[1]
+            
+            wait = 0.0
+            if self.rpm_limit and len(self._req_times) >= self.rpm_limit:
+                wait = self._req_times[0] + window - now
+            if (self.tpm_limit and self._tok_times
+                    and self._window_tokens + est_tokens > self.tpm_limit):
+                wait = max(wait, self._tok_times[0][0] + window - now)
+            
+            if wait <= 0:
+                break
+            self.logger.info(f"Throttling Claude request for {wait:.1f}s to stay under rate limits")
+            await asyncio.sleep(wait)
+        
+        self._req_times.append(now)
+        self._tok_times.append((now, est_tokens))
+        self._window_tokens += est_tokens
+    
+    def _cli_path(self) -> str:
+        """Absolute path of the claude executable, resolved once per client."""
+        if self._claude_path is None:
+            self._claude_path = shutil.which("claude") or "claude"
+        return self._claude_path
+    
+    def _cli_project_root(self) -> Path:
+        """Directory the Claude CLI runs in, resolved once per client."""
+        if self._project_root is not None:
+            return self._project_root
+        
+        # Get project root from config (SignLanguageTranslate directory)
+        # Config path is relative to automation dir, e.g., "../SignLanguageTranslate.xcodeproj"
+        # We need to resolve it to get the absolute project root
+        project_path = self.config.get("project", {}).get("path", "")
+        if project_path:
+            # Resolve the relative path from the config directory (automation/)
+            xcodeproj_path = Path(project_path).resolve()
+            # xcodeproj is at repo_root/SignLanguageTranslate.xcodeproj
+            # Project source is at repo_root/SignLanguageTranslate/
+            project_root = xcodeproj_path.parent / "SignLanguageTranslate"
+            if not project_root.exists():
+                # Fallback to repo root
+                project_root = xcodeproj_path.parent
         else:
-            return await self._send_via_api(prompt, context)
+            project_root = Path.cwd()
+        
+        self._project_root = project_root
+        return project_root
     
     async def _send_via_cli(self, prompt: str, context: str = None) -> ClaudeResponse:
         """Send prompt via Claude CLI (claude command)."""
-        # Combine prompt and context
-        full_prompt = prompt
-        if context:
-            full_prompt = f"{context}\n\n---\n\n{prompt}"
+        # Context and prompt are written to stdin separately rather than
+        # concatenated into one (potentially very large) string
+        parts = [context, "\n\n---\n\n", prompt] if context else [prompt]
 
         # Log prompt size for visibility
-        prompt_chars = len(full_prompt)
-        prompt_lines = full_prompt.count('\n') + 1
-        self.logger.info(f"Sending prompt to Claude CLI: {prompt_chars:,} chars, {prompt_lines} lines")
+        prompt_chars = sum(len(part) for part in parts)
+        self.logger.info(f"Sending prompt to Claude CLI: {prompt_chars:,} chars")
+        if self.logger.is_debug_enabled():
+            prompt_lines = sum(part.count('\n') for part in parts) + 1
+            self.logger.debug(f"Prompt is {prompt_lines} lines")
 
         try:
             # Build CLI command with:
             # --print: non-interactive output mode
             # --permission-mode acceptEdits: auto-accept file edits so Claude can write project files
-            cmd = ["claude", "--print", "--permission-mode", "acceptEdits"]
+            cmd = [self._cli_path(), "--print", "--permission-mode", "acceptEdits"]
 
             self.logger.debug(f"Running Claude CLI with flags: {' '.join(cmd[1:])}")
 
-            # Get project root from config (SignLanguageTranslate directory)
-            # Config path is relative to automation dir, e.g., "../SignLanguageTranslate.xcodeproj"
-            # We need to resolve it to get the absolute project root
-            project_path = self.config.get("project", {}).get("path", "")
-            if project_path:
-                # Resolve the relative path from the config directory (automation/)
-                xcodeproj_path = Path(project_path).resolve()
-                # xcodeproj is at repo_root/SignLanguageTranslate.xcodeproj
-                # Project source is at repo_root/SignLanguageTranslate/
-                project_root = xcodeproj_path.parent / "SignLanguageTranslate"
-                if not project_root.exists():
-                    # Fallback to repo root
-                    project_root = xcodeproj_path.parent
-            else:
-                project_root = Path.cwd()
+            project_root = self._cli_project_root()
 
             self.logger.info(f"Running Claude CLI in directory: {project_root}")
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(project_root)
-            )
+            # Feed the prompt from an anonymous temp file instead of a pipe so
+            # the CLI reads it straight from the kernel without a bytes copy
+            with tempfile.TemporaryFile("w+", encoding="utf-8") as prompt_file:
+                prompt_file.writelines(parts)
+                prompt_file.seek(0)
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=prompt_file,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(project_root)
+                )
 
             # Track timing
             start_time = time.time()
@@ -137,26 +404,34 @@ class ClaudeClient:
             # Log that we're waiting
             self.logger.info("Waiting for Claude response... (this may take 1-5 minutes)")
 
-            # Create a progress indicator task
-            async def log_progress():
-                elapsed = 0
-                while True:
-                    await asyncio.sleep(30)
-                    elapsed += 30
-                    self.logger.info(f"Still waiting for Claude... ({elapsed}s elapsed)")
+            # File blocks are parsed while Claude is still generating
+            file_stream = _FileChangeStream()
+
+            # Progress indicator: a self-rescheduling timer rather than a task,
+            # so stopping it is a plain handle cancel
+            loop = asyncio.get_running_loop()
+            progress_timer = None
 
-            progress_task = asyncio.create_task(log_progress())
+            def log_progress():
+                nonlocal progress_timer
+                elapsed = int(time.time() - start_time)
+                self.logger.info(
+                    f"Still waiting for Claude... ({elapsed}s elapsed, "
+                    f"{file_stream.chars_received:,} chars received)"
+                )
+                progress_timer = loop.call_later(30, log_progress)
+
+            progress_timer = loop.call_later(30, log_progress)
 
             try:
                 # Set a timeout (5 minutes max - Claude should respond faster)
                 timeout = self.claude_config.get("timeout_seconds", 300)
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(input=full_prompt.encode('utf-8')),
+                stdout_text, stderr = await asyncio.wait_for(
+                    self._collect_output(process, file_stream),
                     timeout=timeout
                 )
             except asyncio.TimeoutError:
                 process.kill()
-                progress_task.cancel()
                 self.logger.error(f"Claude CLI timed out after {timeout}s")
                 return ClaudeResponse(
                     success=False,
@@ -165,21 +440,18 @@ class ClaudeClient:
                     model=self.model
                 )
             finally:
-                progress_task.cancel()
-                try:
-                    await progress_task
-                except asyncio.CancelledError:
-                    pass
+                progress_timer.cancel()
 
             elapsed_time = time.time() - start_time
 
-            stdout_text = stdout.decode('utf-8', errors='replace')
             stderr_text = stderr.decode('utf-8', errors='replace')
 
             # Log response stats
             response_chars = len(stdout_text)
-            response_lines = stdout_text.count('\n') + 1
-            self.logger.info(f"Claude responded in {elapsed_time:.1f}s: {response_chars:,} chars, {response_lines} lines")
+            self.logger.info(f"Claude responded in {elapsed_time:.1f}s: {response_chars:,} chars")
+            if self.logger.is_debug_enabled():
+                response_lines = stdout_text.count('\n') + 1
+                self.logger.debug(f"Response is {response_lines} lines")
 
             # Check for rate limit - check both stderr and stdout
             if self._is_rate_limit_error(stderr_text, stdout_text):
@@ -203,7 +475,7 @@ class ClaudeClient:
                 )
 
             # Parse response for file changes
-            files = self._extract_file_changes(stdout_text)
+            files = file_stream.finish()
             self.logger.info(f"Extracted {len(files)} file changes from response")
             for f in files:
                 self.logger.debug(f"  - {f.path} ({len(f.content):,} chars)")
@@ -224,11 +496,39 @@ class ClaudeClient:
                 model=self.model
             )
     
+    async def _collect_output(self, process, file_stream: _FileChangeStream) -> tuple[str, bytes]:
+        """
+        Read CLI stdout in chunks, feeding it to the file parser as it arrives,
+        while draining stderr concurrently.
+        
+        Returns:
+            Tuple of (decoded stdout, raw stderr)
+        """
+        async def read_stdout() -> str:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            chunks = []
+            while chunk := await process.stdout.read(_READ_CHUNK_SIZE):
+                text = decoder.decode(chunk)
+                chunks.append(text)
+                file_stream.feed(text)
+                if len(chunks) % _PROGRESS_EVERY_CHUNKS == 0:
+                    self.logger.debug(
+                        f"Claude output: {file_stream.chars_received:,} chars, "
+                        f"{len(file_stream.files)} files parsed so far"
+                    )
+            text = decoder.decode(b"", final=True)
+            chunks.append(text)
+            file_stream.feed(text)
+            return "".join(chunks)
+        
+        stdout_text, stderr = await asyncio.gather(read_stdout(), process.stderr.read())
+        await process.wait()
+        return stdout_text, stderr
+    
     async def _send_via_api(self, prompt: str, context: str = None) -> ClaudeResponse:
         """Send prompt via Anthropic API."""
-        try:
-            import anthropic
-        except ImportError:
+        anthropic = self._anthropic
+        if anthropic is None:
             raise RuntimeError("anthropic package not installed. Run: pip install anthropic")
         
         api_key = os.environ.get(self.api_key_env)
@@ -236,34 +536,40 @@ class ClaudeClient:
             raise RuntimeError(f"API key not found in environment variable: {self.api_key_env}")
         
         if self._api_client is None:
-            self._api_client = anthropic.AsyncAnthropic(api_key=api_key)
-        
-        # Build messages
-        messages = []
+            # One keep-alive HTTP/2 pool shared by every call until aclose(),
+            # so later iterations skip the TCP/TLS handshake
+            import httpx
+            
+            timeout = self.claude_config.get("timeout_seconds", 600)
+            self._api_client = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                http_client=httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=10,
+                        max_connections=10,
+                        keepalive_expiry=60.0
+                    ),
+                    timeout=httpx.Timeout(timeout)
+                )
+            )
         
+        # Project context goes in the system prompt rather than a synthetic
+        # user/assistant exchange ahead of the real request
+        request = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        }
         if context:
-            messages.append({
-                "role": "user",
-                "content": f"Here is the current project context:\n\n{context}"
-            })
-            messages.append({
-                "role": "assistant", 
-                "content": "I've reviewed the project context. What would you like me to help with?"
-            })
-        
-        messages.append({
-            "role": "user",
-            "content": prompt
-        })
+            request["system"] = f"Here is the current project context:\n\n{context}"
         
         try:
             self.logger.debug(f"Calling Claude API with model {self.model}")
             
-            response = await self._api_client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                messages=messages
-            )
+            raw = await self._api_client.messages.with_raw_response.create(**request)
+            response = raw.parse()
+            self._note_rate_limit_headers(raw.headers)
             
             content = ""
             for block in response.content:
@@ -271,7 +577,7 @@ class ClaudeClient:
                     content += block.text
             
             # Parse response for file changes
-            files = self._extract_file_changes(content)
+            files = await self._parse_file_changes(content)
             
             return ClaudeResponse(
                 success=True,
@@ -296,20 +602,18 @@ class ClaudeClient:
     
     def _parse_retry_after(self, error_text: str) -> Optional[int]:
         """Try to parse retry-after value from error message."""
-        error_lower = error_text.lower()
-
+        # One clock read shared by both reset-time patterns
+        now = datetime.now()
+        
         # Pattern 1: Date-based reset messages with full date
-        # "You've hit your limit · resets Jan 10 at 9:30am (Asia/Calcutta)"
-        date_pattern = r'resets?\s+([a-z]{3})\s+(\d{1,2})\s+(?:at\s+)?(\d{1,2}):(\d{2})(am|pm)'
-        date_match = re.search(date_pattern, error_lower)
+        date_match = self._RESET_DATE_RE.search(error_text)
         if date_match:
             try:
                 month_str, day, hour, minute, ampm = date_match.groups()
+                ampm = ampm.lower()
                 
                 # Convert month name to number
-                months = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-                          'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
-                month = months.get(month_str, 1)
+                month = self._MONTHS.get(month_str.lower(), 1)
                 
                 # Convert hour to 24-hour format
                 hour = int(hour)
@@ -319,7 +623,6 @@ class ClaudeClient:
                     hour = 0
                 
                 # Build the reset datetime
-                now = datetime.now()
                 year = now.year
                 # If the date seems to be in the past, it's next year
                 reset_date = datetime(year, month, int(day), hour, int(minute))
@@ -334,12 +637,11 @@ class ClaudeClient:
                 self.logger.debug(f"Failed to parse date-based reset time: {e}")
 
         # Pattern 2: Time-only reset messages (assumes today or tomorrow)
-        # "You've hit your limit · resets 9:30am (Asia/Calcutta)"
-        time_pattern = r'resets?\s+(\d{1,2}):(\d{2})(am|pm)'
-        time_match = re.search(time_pattern, error_lower)
+        time_match = self._RESET_TIME_RE.search(error_text)
         if time_match:
             try:
                 hour, minute, ampm = time_match.groups()
+                ampm = ampm.lower()
                 
                 # Convert hour to 24-hour format
                 hour = int(hour)
@@ -349,12 +651,10 @@ class ClaudeClient:
                     hour = 0
                 
                 # Build the reset datetime (today first, tomorrow if in past)
-                now = datetime.now()
                 reset_date = now.replace(hour=hour, minute=int(minute), second=0, microsecond=0)
                 if reset_date <= now:
                     # Reset time is in the past today, so it must be tomorrow
-                    from datetime import timedelta
-                    reset_date = reset_date + timedelta(days=1)
+                    reset_date += timedelta(days=1)
                 
                 # Calculate seconds until reset + 60s buffer to ensure limit is cleared
                 seconds_until_reset = int((reset_date - now).total_seconds()) + 60
@@ -363,95 +663,75 @@ class ClaudeClient:
             except Exception as e:
                 self.logger.debug(f"Failed to parse time-based reset time: {e}")
 
-        # Common patterns for rate limit reset time
-        patterns = [
-            r'retry.?after[:\s]+(\d+)',
-            r'wait[:\s]+(\d+)\s*second',
-            r'(\d+)\s*seconds?\s*(?:before|until)',
-            r'try again in (\d+)\s*(?:second|minute|hour)',
-            r'reset(?:s|ting)?\s*(?:in|after)\s*(\d+)',
-            r'limit.*?(\d+)\s*(?:second|minute)',
-            r'please wait (\d+)',
-            r'available in (\d+)',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, error_lower)
+        for pattern in self._RETRY_PATTERNS:
+            match = pattern.search(error_text)
             if match:
                 value = int(match.group(1))
+                nearby = error_text[max(0, match.start()-20):match.end()+20].lower()
                 # If it mentions minutes, convert to seconds
-                if 'minute' in error_lower[max(0, match.start()-20):match.end()+20]:
+                if 'minute' in nearby:
                     value *= 60
                 # If it mentions hours, convert to seconds
-                elif 'hour' in error_lower[max(0, match.start()-20):match.end()+20]:
+                elif 'hour' in nearby:
                     value *= 3600
                 self.logger.debug(f"Parsed retry-after from error: {value}s")
                 return value
 
         return None
 
+    def _note_rate_limit_headers(self, headers):
+        """Schedule a pause when the API reports few requests remaining."""
+        try:
+            remaining = int(headers.get("anthropic-ratelimit-requests-remaining"))
+            limit = int(headers.get("anthropic-ratelimit-requests-limit", 0))
+        except (TypeError, ValueError):
+            return
+        
+        if remaining <= max(2, 0.1 * limit):
+            retry_after = headers.get("retry-after")
+            pause = int(retry_after) if retry_after and retry_after.isdigit() else 5
+            self._preemptive_pause_until = time.monotonic() + pause
+            self.logger.debug(f"API requests remaining: {remaining}/{limit}, pausing next call {pause}s")
+    
     def _is_rate_limit_error(self, stderr_text: str, stdout_text: str = "") -> bool:
         """Check if the error indicates a rate limit."""
-        combined = (stderr_text + stdout_text).lower()
-        rate_limit_indicators = [
-            'rate limit',
-            'rate_limit',
-            'too many requests',
-            'quota exceeded',
-            'throttl',
-            'overloaded',
-            'capacity',
-            '429',
-            'try again later',
-            'request limit',
-            'hit your limit',
-            "you've hit",
-            'resets',
-        ]
-        return any(indicator in combined for indicator in rate_limit_indicators)
+        return bool(
+            self._RATE_LIMIT_RE.search(stderr_text) or self._RATE_LIMIT_RE.search(stdout_text)
+        )
+    
+    async def _parse_file_changes(self, response_text: str) -> list[FileChange]:
+        """Extract file changes, off the event loop for large responses."""
+        if len(response_text) > self.PARSE_OFFLOAD_THRESHOLD:
+            return await asyncio.to_thread(self._extract_file_changes, response_text)
+        return self._extract_file_changes(response_text)
     
     def _extract_file_changes(self, response_text: str) -> list[FileChange]:
         """Extract file changes from Claude's response."""
+        # Without a code fence there is nothing to extract (e.g. a plain reply)
+        if '```' not in response_text:
+            return []
+        
         files = []
         
-        # Pattern 1: ### path/to/file.swift followed by code block
-        # Pattern 2: **path/to/file.swift** followed by code block
-        # Pattern 3: File: path/to/file.swift followed by code block
-        
-        file_markers = [
-            r'###\s+([\w/\-\.]+\.(?:swift|md|yaml|json|txt|py))',
-            r'\*\*([\w/\-\.]+\.(?:swift|md|yaml|json|txt|py))\*\*',
-            r'File:\s*([\w/\-\.]+\.(?:swift|md|yaml|json|txt|py))',
-            r'`([\w/\-\.]+\.(?:swift|md|yaml|json|txt|py))`',
-        ]
-        
-        combined_pattern = '|'.join(f'(?:{p})' for p in file_markers)
-        
-        # Find all file markers and their positions
-        markers = []
-        for match in re.finditer(combined_pattern, response_text, re.MULTILINE):
-            filename = None
-            for g in match.groups():
-                if g:
-                    filename = g
-                    break
-            if filename:
-                markers.append((match.start(), match.end(), filename))
-        
-        # For each marker, extract the following code block
-        for i, (start, end, filename) in enumerate(markers):
-            next_pos = markers[i + 1][0] if i + 1 < len(markers) else len(response_text)
-            section = response_text[end:next_pos]
-            
-            code_match = re.search(r'```(?:\w+)?\n(.*?)```', section, re.DOTALL)
+        def add_block(marker, section_end: int):
+            # The block must start before the next marker, else the marker has none
+            code_match = _CODE_BLOCK_RE.search(response_text, marker.end(), section_end)
             if code_match:
-                content = code_match.group(1).strip()
                 files.append(FileChange(
-                    path=filename,
-                    content=content,
+                    path=marker.group(marker.lastindex),
+                    content=code_match.group(1).strip(),
                     action="create"
                 ))
         
+        # Single pass over the markers, resolving each one when the next is found
+        previous = None
+        for marker in _FILE_MARKER_RE.finditer(response_text):
+            if previous is not None:
+                add_block(previous, marker.start())
+            previous = marker
+        if previous is not None:
+            add_block(previous, len(response_text))
+        
         return files
     
     def build_fix_prompt(self, original_prompt: str, errors: list, error_type: str = "build") -> str:
@@ -496,17 +776,21 @@ Please provide the corrected code files."""
 
 Please provide the corrected code files."""
     
-    async def check_available(self) -> bool:
-        """Check if Claude is available."""
+    async def check_available(self, refresh: bool = False) -> bool:
+        """
+        Check if Claude is available.
+        
+        Args:
+            refresh: Re-check instead of returning the cached result
+        """
+        if self._available is not None and not refresh:
+            return self._available
+        
         if self.use_cli:
             # Check if claude command exists
-            process = await asyncio.create_subprocess_exec(
-                "which", "claude",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await process.communicate()
-            return process.returncode == 0
+            self._available = shutil.which("claude") is not None
         else:
             # Check for API key
-            return os.environ.get(self.api_key_env) is not None
+            self._available = os.environ.get(self.api_key_env) is not None
+        
+        return self._available
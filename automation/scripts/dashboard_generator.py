@@ -3,14 +3,12 @@ Dashboard generation for GitHub Pages.
 """
 
 import asyncio
-import json
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import aiofiles
-
-from models import ExecutionState, Status, PhaseConfig
+from models import ExecutionState, Status, PhaseConfig, serialize
 from analytics_collector import AnalyticsCollector
 from logger import get_logger
 
@@ -18,6 +16,12 @@ from logger import get_logger
 class DashboardGenerator:
     """Generates GitHub Pages dashboard content."""
     
+    # Per-iteration status writes closer together than this are coalesced
+    STATUS_MIN_INTERVAL_SECONDS = 2.0
+    
+    # How long overall stats are reused between status writes
+    STATS_TTL_SECONDS = 1.0
+    
     def __init__(self, config: dict, analytics: AnalyticsCollector):
         self.config = config
         self.analytics = analytics
@@ -32,6 +36,13 @@ class DashboardGenerator:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
         self.logger = get_logger()
+        
+        self._last_status_write = 0.0
+        self._status_pending: Optional[asyncio.Task] = None
+        self._status_latest: Optional[tuple[ExecutionState, PhaseConfig]] = None
+        
+        self._stats_cache: Optional[dict] = None
+        self._stats_cache_at = 0.0
     
     async def update_status(self, state: ExecutionState, phase: PhaseConfig = None):
         """Update the status JSON file."""
@@ -40,7 +51,7 @@ class DashboardGenerator:
         
         try:
             # Get overall stats
-            stats = await self.analytics.get_overall_stats()
+            stats = await self._get_stats_cached()
             
             status_data = {
                 "last_updated": datetime.now().isoformat(),
@@ -74,53 +85,46 @@ class DashboardGenerator:
             }
             
             await self._write_json("status.json", status_data)
+            self._last_status_write = time.monotonic()
             
         except Exception as e:
             self.logger.error(f"Failed to update status: {e}")
     
-    async def update_history(self):
-        """Update the history JSON file."""
+    async def update_dashboard(self, screenshots: list[dict]):
+        """Update the combined history, analytics and screenshots JSON file."""
         if not self.enabled:
             return
         
         try:
-            phases = await self.analytics.get_phase_history()
+            stats, phases, timeline = await asyncio.gather(
+                self._get_stats_cached(),
+                self.analytics.get_phase_history(),
+                self.analytics.get_timeline()
+            )
             
-            history_data = {
-                "last_updated": datetime.now().isoformat(),
-                "phases": phases
-            }
-            
-            await self._write_json("history.json", history_data)
-            
-        except Exception as e:
-            self.logger.error(f"Failed to update history: {e}")
-    
-    async def update_analytics(self):
-        """Update the analytics JSON file."""
-        if not self.enabled:
-            return
-        
-        try:
-            await self.analytics.export_to_json(self.data_dir / "analytics.json")
-        except Exception as e:
-            self.logger.error(f"Failed to update analytics: {e}")
-    
-    async def update_screenshots(self, screenshots: list[dict]):
-        """Update the screenshots JSON file."""
-        if not self.enabled:
-            return
-        
-        try:
-            screenshots_data = {
-                "last_updated": datetime.now().isoformat(),
-                "screenshots": screenshots
+            now = datetime.now().isoformat()
+            dashboard_data = {
+                "last_updated": now,
+                "history": {
+                    "last_updated": now,
+                    "phases": phases
+                },
+                "analytics": {
+                    "exported_at": now,
+                    "overall": stats,
+                    "phases": phases,
+                    "timeline": timeline
+                },
+                "screenshots": {
+                    "last_updated": now,
+                    "screenshots": screenshots
+                }
             }
             
-            await self._write_json("screenshots.json", screenshots_data)
+            await self._write_json("dashboard.json", dashboard_data)
             
         except Exception as e:
-            self.logger.error(f"Failed to update screenshots: {e}")
+            self.logger.error(f"Failed to update dashboard data: {e}")
     
     async def update_all(self, state: ExecutionState, phase: PhaseConfig = None, 
                          screenshots: list[dict] = None):
@@ -130,16 +134,25 @@ class DashboardGenerator:
         
         await asyncio.gather(
             self.update_status(state, phase),
-            self.update_history(),
-            self.update_analytics(),
-            self.update_screenshots(screenshots or [])
+            self.update_dashboard(screenshots or [])
         )
     
+    async def _get_stats_cached(self) -> dict:
+        """Get overall stats, reusing a result fetched within the TTL."""
+        now = time.monotonic()
+        if self._stats_cache is None or now - self._stats_cache_at >= self.STATS_TTL_SECONDS:
+            self._stats_cache = await self.analytics.get_overall_stats()
+            self._stats_cache_at = now
+        return self._stats_cache
+    
     async def _write_json(self, filename: str, data: dict):
-        """Write JSON data to file."""
+        """Write JSON data to file, serializing and writing in a worker thread."""
         output_path = self.data_dir / filename
-        async with aiofiles.open(output_path, 'w') as f:
-            await f.write(json.dumps(data, indent=2))
+        
+        def write():
+            output_path.write_bytes(serialize(data, indent=True))
+        
+        await asyncio.to_thread(write)
     
     async def push_to_github_pages(self) -> bool:
         """Push dashboard changes to GitHub Pages branch."""
@@ -163,11 +176,13 @@ class DashboardGenerator:
     
     async def on_phase_complete(self, state: ExecutionState, phase: PhaseConfig):
         """Called when a phase completes."""
+        self._stats_cache = None
         if self.dashboard_config.get("update_on_phase_complete", True):
             await self.update_all(state, phase)
     
     async def on_phase_failed(self, state: ExecutionState, phase: PhaseConfig):
         """Called when a phase fails."""
+        self._stats_cache = None
         if self.dashboard_config.get("update_on_error", True):
             await self.update_all(state, phase)
     
@@ -179,4 +194,34 @@ class DashboardGenerator:
     async def on_iteration(self, state: ExecutionState, phase: PhaseConfig):
         """Called periodically during iterations."""
         # Only update status for iterations (less data)
-        await self.update_status(state, phase)
+        self._status_latest = (state, phase)
+        if self._status_pending is not None:
+            return
+        
+        remaining = self.STATUS_MIN_INTERVAL_SECONDS - (time.monotonic() - self._last_status_write)
+        if remaining > 0:
+            self._status_pending = asyncio.create_task(self._delayed_status(remaining))
+        else:
+            await self.update_status(state, phase)
+    
+    async def aclose(self):
+        """Write a coalesced status update that is still waiting for its interval."""
+        task = self._status_pending
+        if task is None:
+            return
+        
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._status_pending = None
+        await self.update_status(*self._status_latest)
+    
+    async def _delayed_status(self, delay: float):
+        """Write the most recent iteration status once the interval has passed."""
+        try:
+            await asyncio.sleep(delay)
+            await self.update_status(*self._status_latest)
+        finally:
+            self._status_pending = None
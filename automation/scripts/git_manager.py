@@ -3,78 +3,277 @@ Git operations for committing changes.
 """
 
 import asyncio
+import os
+import shlex
+import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-from jinja2 import Template
+from jinja2 import Environment, meta
 
 from models import PhaseConfig
 from logger import get_logger
 
 
+# Shared environment for compiling commit message templates
+_TEMPLATE_ENV = Environment(autoescape=False)
+
+# Short read-only commands run with subprocess.run in a worker thread,
+# avoiding the asyncio subprocess transport setup per call
+_QUERY_COMMANDS = frozenset({"rev-parse", "status", "diff", "ls-files", "rev-list"})
+
+
+def _sync_git_run(cmd: list[str], timeout: int) -> tuple[int, bytes, bytes]:
+    """Run a git command synchronously, returning (returncode, stdout, stderr)."""
+    result = subprocess.run(cmd, capture_output=True, check=False, timeout=timeout)
+    return result.returncode, result.stdout, result.stderr
+
+
 class GitManager:
     """Manages git operations."""
     
+    # How long a looked-up branch name is reused
+    BRANCH_CACHE_TTL_SECONDS = 5.0
+    
     def __init__(self, config: dict, project_root: Path):
         self.config = config
         self.project_root = project_root
+        self._project_root_str = str(project_root)
         self.git_config = config.get("git", {})
         
         self.enabled = self.git_config.get("enabled", True)
         self.auto_commit = self.git_config.get("auto_commit", True)
         self.auto_push = self.git_config.get("auto_push", False)
+        self.untracked_mode = self.git_config.get("untracked_mode", "normal")
         
         self.commit_template = self.git_config.get("commit_message_template", 
             "feat({{ module }}): Phase {{ phase_id }} - {{ phase_name }}")
+        self._commit_template = _TEMPLATE_ENV.from_string(self.commit_template)
+        self._template_uses_timestamp = "timestamp" in meta.find_undeclared_variables(
+            _TEMPLATE_ENV.parse(self.commit_template)
+        )
         
         self.logger = get_logger()
+        
+        # Long-lived `git cat-file --batch-check` process for read-only lookups
+        self._batch: Optional[asyncio.subprocess.Process] = None
+        self._batch_lock = asyncio.Lock()
+        
+        # Result of the first repository check, reused for later phases
+        self._is_repo: Optional[bool] = None
+        if self.enabled == "auto":
+            # Probe once at startup; git stays enabled only inside a repository
+            self._is_repo = self._probe_repo()
+            self.enabled = self._is_repo
+        
+        # Current branch, re-queried after the TTL or a branch switch
+        self._branch_cache: Optional[str] = None
+        self._branch_cache_expires = 0.0
     
     async def _run_git(self, args: list[str], timeout: int = 30) -> tuple[bool, str]:
         """Run git command in project root."""
-        cmd = ["git"] + args
+        # git -C selects the repository itself, so no cwd is passed to the spawn
+        cmd = ["git", "-C", self._project_root_str] + args
+        return await self._run_command(cmd, timeout, query=args[0] in _QUERY_COMMANDS)
+    
+    async def _run_git_chain(self, stages: list[list[str]], timeout: int = 30) -> tuple[bool, str]:
+        """
+        Run git commands as a single `sh -c` && chain, so dependent steps
+        cost one spawn. Stops at the first failing stage.
+        """
+        if os.name == "nt":
+            # No POSIX shell on Windows; run the stages one at a time
+            for stage in stages:
+                success, output = await self._run_git(stage, timeout)
+                if not success:
+                    break
+            return success, output
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(self.project_root)
-        )
+        git = shlex.join(["git", "-C", self._project_root_str])
+        script = " && ".join(f"{git} {shlex.join(stage)}" for stage in stages)
+        return await self._run_command(["sh", "-c", script], timeout)
+    
+    async def _run_command(self, cmd: list[str], timeout: int, query: bool = False) -> tuple[bool, str]:
+        """Run a command, in a worker thread for short read-only queries."""
+        if query:
+            try:
+                returncode, stdout, stderr = await asyncio.to_thread(
+                    _sync_git_run, cmd, timeout
+                )
+            except subprocess.TimeoutExpired:
+                return False, "Command timed out"
+        else:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                return False, "Command timed out"
+            returncode = process.returncode
+        
+        success = returncode == 0
+        # Some failures (e.g. "nothing to commit") are reported on stdout
+        output = stdout if success else (stderr.strip() or stdout)
+        return success, output.decode().strip()
+    
+    async def _batch_query(self, rev: str, timeout: int = 10) -> Optional[str]:
+        """
+        Resolve a revision through the persistent batch helper.
+        
+        Returns:
+            The object name, "<rev> missing" if it does not resolve,
+            or None if the helper is not running (e.g. not a git repository)
+        """
+        async with self._batch_lock:
+            if self._batch is None or self._batch.returncode is not None:
+                self._batch = await asyncio.create_subprocess_exec(
+                    "git", "-C", self._project_root_str,
+                    "cat-file", "--batch-check=%(objectname)",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+            
+            try:
+                self._batch.stdin.write(rev.encode() + b"\n")
+                await self._batch.stdin.drain()
+                line = await asyncio.wait_for(self._batch.stdout.readline(), timeout=timeout)
+            except (BrokenPipeError, ConnectionResetError, asyncio.TimeoutError):
+                line = b""
+            
+            if not line:
+                await self._close_batch()
+                return None
+            return line.decode().strip()
+    
+    async def _close_batch(self):
+        """Stop the batch helper process."""
+        process, self._batch = self._batch, None
+        if process is None or process.returncode is not None:
+            return
         
+        process.stdin.close()
         try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=timeout
-            )
-            success = process.returncode == 0
-            output = stdout.decode().strip() if success else stderr.decode().strip()
-            return success, output
+            await asyncio.wait_for(process.wait(), timeout=5)
         except asyncio.TimeoutError:
             process.kill()
-            return False, "Command timed out"
+            await process.wait()
+    
+    async def aclose(self):
+        """Release the batch helper process."""
+        async with self._batch_lock:
+            await self._close_batch()
+    
+    def _probe_repo(self) -> bool:
+        """Synchronously check whether the project root is inside a git repository."""
+        try:
+            returncode, _, _ = _sync_git_run(
+                ["git", "-C", self._project_root_str, "rev-parse", "--git-dir"], timeout=10
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return returncode == 0
+    
+    def _status_args(self) -> list[str]:
+        """Porcelain status arguments honouring the untracked-files mode."""
+        return [
+            "status", "--porcelain=v2", "-z", f"--untracked-files={self.untracked_mode}",
+            "--ignore-submodules=all", "--no-renames"
+        ]
     
     async def is_git_repo(self) -> bool:
-        """Check if project is a git repository."""
-        success, _ = await self._run_git(["rev-parse", "--git-dir"])
-        return success
+        """Check if project is a git repository (cached after the first check)."""
+        if not self.enabled:
+            return False
+        if self._is_repo is None:
+            self._is_repo = await self._batch_query("HEAD") is not None
+        return self._is_repo
     
     async def has_changes(self) -> bool:
         """Check if there are uncommitted changes."""
-        success, output = await self._run_git(["status", "--porcelain"])
-        return success and len(output.strip()) > 0
+        if not self.enabled:
+            return False
+        
+        # Tracked changes (staged or not); exits 1 silently at the first difference
+        success, output = await self._run_git(["diff", "--quiet", "HEAD", "--"])
+        if not success:
+            if not output:
+                return True
+            # No HEAD yet (unborn branch) - fall back to a status scan
+            success, output = await self._run_git(self._status_args())
+            return success and len(output.strip()) > 0
+        
+        if self.untracked_mode == "no":
+            return False
+        
+        success, output = await self._run_git(self._untracked_args())
+        return success and len(output) > 0
     
-    async def get_changed_files(self) -> list[str]:
+    def _untracked_args(self) -> list[str]:
+        """ls-files arguments listing untracked files per the untracked-files mode."""
+        args = ["ls-files", "--others", "--exclude-standard", "-z"]
+        if self.untracked_mode != "all":
+            # Collapse untracked directories to a single entry, like status -unormal
+            args += ["--directory", "--no-empty-directory"]
+        return args
+    
+    async def get_changed_files(self, include_untracked: bool = True) -> list[str]:
         """Get list of changed files."""
-        success, output = await self._run_git(["status", "--porcelain"])
+        if not self.enabled:
+            return []
+        
+        include_untracked = include_untracked and self.untracked_mode != "no"
+        
+        queries = [self._run_git(["diff", "--name-only", "--no-renames", "-z", "HEAD", "--"])]
+        if include_untracked:
+            queries.append(self._run_git(self._untracked_args()))
+        results = await asyncio.gather(*queries)
+        
+        success, output = results[0]
+        if not success:
+            # No HEAD yet (unborn branch) - fall back to a status scan
+            return await self._get_changed_files_from_status()
+        
+        files = [name for name in output.split('\0') if name]
+        if include_untracked:
+            success, output = results[1]
+            if success:
+                files.extend(name for name in output.split('\0') if name)
+        
+        return files
+    
+    async def _get_changed_files_from_status(self) -> list[str]:
+        """Get changed files by parsing porcelain v2 status records."""
+        success, output = await self._run_git(self._status_args())
         if not success:
             return []
         
         files = []
-        for line in output.split('\n'):
-            if line.strip():
-                # Format: "XY filename" or "XY filename -> newname"
-                parts = line[3:].split(' -> ')
-                files.append(parts[-1])
+        records = iter(output.split('\0'))
+        for record in records:
+            if not record:
+                continue
+            kind = record[0]
+            # Paths follow a fixed number of space-separated fields per record type
+            if kind == '1':
+                files.append(record.split(' ', 8)[8])
+            elif kind == '2':
+                files.append(record.split(' ', 9)[9])
+                next(records, None)  # original path of the rename
+            elif kind == 'u':
+                files.append(record.split(' ', 10)[10])
+            elif kind == '?':
+                files.append(record[2:])
         
         return files
     
@@ -95,14 +294,19 @@ class GitManager:
             self.logger.error(f"Failed to stage files: {output}")
         return success
     
-    async def commit(self, message: str) -> Optional[str]:
+    async def commit(self, message: str, stage_all: bool = False) -> Optional[str]:
         """
-        Commit staged changes.
+        Commit staged changes, optionally staging everything first.
         
         Returns:
             Commit hash if successful, None otherwise
         """
-        success, output = await self._run_git(["commit", "-m", message])
+        # --quiet skips the post-commit summary and its diffstat
+        commit_args = ["commit", "--quiet", "-m", message]
+        if stage_all:
+            success, output = await self._run_git_chain([["add", "-A"], commit_args])
+        else:
+            success, output = await self._run_git(commit_args)
         
         if not success:
             if "nothing to commit" in output.lower():
@@ -111,10 +315,10 @@ class GitManager:
             self.logger.error(f"Failed to commit: {output}")
             return None
         
-        # Get commit hash
-        success, hash_output = await self._run_git(["rev-parse", "HEAD"])
-        if success:
-            return hash_output.strip()
+        # Get commit hash from the batch helper rather than a new git process
+        hash_output = await self._batch_query("HEAD")
+        if hash_output and not hash_output.endswith(" missing"):
+            return hash_output
         
         return "unknown"
     
@@ -132,6 +336,7 @@ class GitManager:
     async def create_branch(self, branch_name: str) -> bool:
         """Create and checkout a new branch."""
         success, output = await self._run_git(["checkout", "-b", branch_name])
+        self._branch_cache = None
         if not success:
             self.logger.error(f"Failed to create branch: {output}")
         return success
@@ -139,29 +344,44 @@ class GitManager:
     async def checkout(self, branch: str) -> bool:
         """Checkout a branch."""
         success, output = await self._run_git(["checkout", branch])
+        self._branch_cache = None
         if not success:
             self.logger.error(f"Failed to checkout: {output}")
         return success
     
     async def get_current_branch(self) -> Optional[str]:
         """Get current branch name."""
+        if not self.enabled:
+            return None
+        
+        now = time.monotonic()
+        if self._branch_cache is not None and now < self._branch_cache_expires:
+            return self._branch_cache
+        
         success, output = await self._run_git(["rev-parse", "--abbrev-ref", "HEAD"])
-        return output if success else None
+        if not success:
+            return None
+        
+        self._branch_cache = output
+        self._branch_cache_expires = now + self.BRANCH_CACHE_TTL_SECONDS
+        return output
     
     def render_commit_message(self, phase: PhaseConfig, module_id: str, 
-                               iterations: int, duration: float, description: str = "") -> str:
+                               iterations: int, duration: float, description: str = "",
+                               now: Callable[[], datetime] = datetime.now) -> str:
         """Render commit message from template."""
-        template = Template(self.commit_template)
-        
-        return template.render(
-            module=module_id,
-            phase_id=phase.id,
-            phase_name=phase.name,
-            description=description or phase.description,
-            iterations=iterations,
-            duration=f"{duration:.1f}s",
-            timestamp=datetime.now().isoformat()
-        )
+        context = {
+            "module": module_id,
+            "phase_id": phase.id,
+            "phase_name": phase.name,
+            "description": description or phase.description,
+            "iterations": iterations,
+            "duration": f"{duration:.1f}s"
+        }
+        if self._template_uses_timestamp:
+            context["timestamp"] = now().strftime("%Y-%m-%dT%H:%M:%S")
+        
+        return self._commit_template.render(context)
     
     async def commit_phase(self, phase: PhaseConfig, module_id: str,
                            iterations: int, duration: float) -> Optional[str]:
@@ -179,22 +399,15 @@ class GitManager:
             self.logger.warning("Not a git repository, skipping commit")
             return None
         
-        if not await self.has_changes():
-            self.logger.debug("No changes to commit")
-            return None
-        
-        # Stage all changes
-        if not await self.stage_all():
-            return None
-        
         # Generate commit message
         message = self.render_commit_message(phase, module_id, iterations, duration)
         
-        # Commit
-        commit_hash = await self.commit(message)
+        # Stage all changes and commit in one spawn; a clean tree is
+        # detected by commit itself (returns None)
+        commit_hash = await self.commit(message, stage_all=True)
         
         if commit_hash:
-            self.logger.commit(commit_hash, message.split('\n')[0])
+            self.logger.commit(commit_hash, message.partition('\n')[0])
             
             # Push if auto-push enabled
             if self.auto_push:
@@ -204,6 +417,9 @@ class GitManager:
     
     async def get_commit_count(self) -> int:
         """Get total commit count."""
+        if not self.enabled:
+            return 0
+        
         success, output = await self._run_git(["rev-list", "--count", "HEAD"])
         if success:
             try:
@@ -2,7 +2,11 @@
 Structured logging with Rich console output.
 """
 
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -10,6 +14,7 @@ from typing import Optional
 
 from rich.console import Console
 from rich.logging import RichHandler
+from rich.text import Text
 from rich.theme import Theme
 
 # Custom theme for console output
@@ -25,10 +30,22 @@ CUSTOM_THEME = Theme({
 
 console = Console(theme=CUSTOM_THEME)
 
+# Fixed prefixes for high-volume lines; printed as Text so message content
+# skips Rich's markup parser (and brackets in compiler output stay literal)
+_ERROR_BULLET = ("      • ", "error")
+_PROGRESS_INDENT = "    "
+
+CONSOLE_FORMATTER = logging.Formatter("%(message)s")
+FILE_FORMATTER = logging.Formatter("%(asctime)s | %(levelname)-8s | %(name)s | %(message)s")
+
 
 class AutomationLogger:
     """Logger with Rich console and file output."""
     
+    # Size-based rollover for the daily log file
+    FILE_MAX_BYTES = 10 * 1024 * 1024
+    FILE_BACKUP_COUNT = 5
+    
     def __init__(
         self,
         name: str = "automation",
@@ -51,23 +68,50 @@ class AutomationLogger:
             show_time=True,
             show_path=False,
             rich_tracebacks=True,
-            tracebacks_show_locals=True
+            # Capturing locals is costly; opt in with AUTOMATION_TRACEBACK_LOCALS=1
+            tracebacks_show_locals=os.environ.get("AUTOMATION_TRACEBACK_LOCALS") == "1"
         )
         console_handler.setLevel(getattr(logging, console_level.upper()))
-        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        console_handler.setFormatter(CONSOLE_FORMATTER)
         self.logger.addHandler(console_handler)
         
-        # File handler
+        # File handler, fed through a queue so disk writes happen on a listener thread
         log_filename = f"automation_{datetime.now().strftime('%Y-%m-%d')}.log"
-        file_handler = logging.FileHandler(
+        file_handler = logging.handlers.RotatingFileHandler(
             self.log_dir / log_filename,
+            maxBytes=self.FILE_MAX_BYTES,
+            backupCount=self.FILE_BACKUP_COUNT,
             encoding="utf-8"
         )
         file_handler.setLevel(getattr(logging, file_level.upper()))
-        file_handler.setFormatter(logging.Formatter(
-            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
-        ))
-        self.logger.addHandler(file_handler)
+        file_handler.setFormatter(FILE_FORMATTER)
+        
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(file_handler.level)
+        self.logger.addHandler(queue_handler)
+        
+        self._listener: Optional[logging.handlers.QueueListener] = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self.close)
+        
+        # Let isEnabledFor() reflect what any handler would actually emit
+        self.logger.setLevel(min(console_handler.level, file_handler.level))
+        
+        # Per-step console lines are info-level detail
+        self._console_verbose = console_handler.level <= logging.INFO
+    
+    def close(self):
+        """Flush queued records to the log file and stop the listener thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+    
+    def is_debug_enabled(self) -> bool:
+        """Whether debug messages reach any handler (guard costly debug formatting)."""
+        return self.logger.isEnabledFor(logging.DEBUG)
     
     def debug(self, message: str, **kwargs):
         self.logger.debug(message, **kwargs)
@@ -104,29 +148,54 @@ class AutomationLogger:
     
     def step_start(self, step: str, iteration: int):
         """Log step start."""
-        console.print(f"  [step]→ {step.capitalize()}[/step] (iteration {iteration})")
+        if self._console_verbose:
+            console.print(f"  [step]→ {step.capitalize()}[/step] (iteration {iteration})")
         self.debug(f"Step: {step}, iteration: {iteration}")
     
     def step_complete(self, step: str):
         """Log step completion."""
-        console.print(f"    [success]✓ {step.capitalize()} succeeded[/success]")
+        if self._console_verbose:
+            console.print(f"    [success]✓ {step.capitalize()} succeeded[/success]")
         self.debug(f"Step {step} completed")
     
     def step_failed(self, step: str, error_count: int):
         """Log step failure."""
-        console.print(f"    [error]✗ {step.capitalize()} failed ({error_count} errors)[/error]")
+        if self._console_verbose:
+            console.print(f"    [error]✗ {step.capitalize()} failed ({error_count} errors)[/error]")
         self.debug(f"Step {step} failed with {error_count} errors")
     
     def build_error(self, error: str):
         """Log a build error."""
-        console.print(f"      [error]• {error}[/error]")
+        if self._console_verbose:
+            console.print(Text.assemble(_ERROR_BULLET, (error, "error")))
         self.debug(f"Build error: {error}")
     
     def test_failure(self, test: str, message: str):
         """Log a test failure."""
-        console.print(f"      [error]• {test}: {message}[/error]")
+        if self._console_verbose:
+            console.print(Text.assemble(_ERROR_BULLET, (f"{test}: {message}", "error")))
         self.debug(f"Test failure: {test} - {message}")
     
+    def build_errors(self, errors: list[str]):
+        """Log several build errors with one console print and one log record."""
+        if not errors:
+            return
+        if self._console_verbose:
+            console.print(Text("\n").join(Text.assemble(_ERROR_BULLET, (e, "error")) for e in errors))
+        if self.is_debug_enabled():
+            self.debug("Build errors:" + "".join(f"\n  {e}" for e in errors))
+    
+    def test_failures(self, failures: list[tuple[str, str]]):
+        """Log several (test, message) failures with one console print and one log record."""
+        if not failures:
+            return
+        if self._console_verbose:
+            console.print(Text("\n").join(
+                Text.assemble(_ERROR_BULLET, (f"{test}: {message}", "error")) for test, message in failures
+            ))
+        if self.is_debug_enabled():
+            self.debug("Test failures:" + "".join(f"\n  {test} - {message}" for test, message in failures))
+    
     def rate_limit(self, wait_seconds: int):
         """Log rate limit hit."""
         console.print(f"[warning]⏳ Rate limited. Waiting {wait_seconds}s...[/warning]")
@@ -134,7 +203,8 @@ class AutomationLogger:
     
     def progress(self, message: str):
         """Log progress message."""
-        console.print(f"    [progress]{message}[/progress]")
+        if self._console_verbose:
+            console.print(Text.assemble(_PROGRESS_INDENT, (message, "progress")))
         self.debug(message)
     
     def commit(self, commit_hash: str, message: str):
@@ -173,6 +243,8 @@ def setup_logger(
 ) -> AutomationLogger:
     """Setup and return the global logger."""
     global _logger
+    if _logger is not None:
+        _logger.close()
     _logger = AutomationLogger(
         log_dir=log_dir,
         console_level=console_level,
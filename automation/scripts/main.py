@@ -8,16 +8,12 @@ from pathlib import Path
 
 import click
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
 
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from orchestrator import Orchestrator
-from state_manager import StateManager
-from analytics_collector import AnalyticsCollector
-from utils import load_yaml, format_duration
+# Heavier modules (orchestrator, analytics, rich tables/panels, yaml/jinja2 via
+# utils) are imported inside the commands that use them, keeping --help fast
 
 
 console = Console()
@@ -36,6 +32,9 @@ def cli(ctx, config):
 @click.pass_context
 def setup(ctx):
     """Validate setup and show configuration."""
+    from rich.panel import Panel
+    from utils import load_yaml
+    
     config_path = ctx.obj['config_path']
     
     console.print(Panel.fit("🔧 Setup Validation", style="bold blue"))
@@ -63,21 +62,31 @@ def setup(ctx):
     else:
         console.print(f"[yellow]⚠ Project not found: {project_path}[/yellow]")
     
-    # Check phases directory
+    # Scan phases directory and check Claude availability concurrently
     phases_dir = Path("phases")
-    if phases_dir.exists():
-        phase_files = list(phases_dir.rglob("*.md"))
-        console.print(f"[green]✓ Phases directory found ({len(phase_files)} prompt files)[/green]")
-    else:
-        console.print("[yellow]⚠ Phases directory not found[/yellow]")
     
-    # Check Claude availability
-    async def check_claude():
+    async def run_checks():
         from claude_client import ClaudeClient
         client = ClaudeClient(config)
-        return await client.check_available()
+        
+        def count_phase_files():
+            if not phases_dir.exists():
+                return None
+            return sum(1 for _ in phases_dir.rglob("*.md"))
+        
+        return await asyncio.gather(
+            asyncio.to_thread(count_phase_files),
+            client.check_available()
+        )
+    
+    phase_file_count, claude_available = asyncio.run(run_checks())
+    
+    if phase_file_count is not None:
+        console.print(f"[green]✓ Phases directory found ({phase_file_count} prompt files)[/green]")
+    else:
+        console.print("[yellow]⚠ Phases directory not found[/yellow]")
     
-    if asyncio.run(check_claude()):
+    if claude_available:
         console.print("[green]✓ Claude available[/green]")
     else:
         console.print("[yellow]⚠ Claude not available (check CLI or API key)[/yellow]")
@@ -95,6 +104,8 @@ def setup(ctx):
 @click.pass_context
 def start(ctx, fresh):
     """Start or resume automation."""
+    from orchestrator import Orchestrator
+    
     config_path = ctx.obj['config_path']
     
     async def run():
@@ -106,6 +117,8 @@ def start(ctx, fresh):
         except KeyboardInterrupt:
             console.print("\n[yellow]Execution paused. Use 'resume' to continue.[/yellow]")
             return 130
+        finally:
+            await orchestrator.close()
     
     sys.exit(asyncio.run(run()))
 
@@ -114,6 +127,8 @@ def start(ctx, fresh):
 @click.pass_context
 def resume(ctx):
     """Resume from saved state."""
+    from orchestrator import Orchestrator
+    
     config_path = ctx.obj['config_path']
     
     async def run():
@@ -125,6 +140,8 @@ def resume(ctx):
         except KeyboardInterrupt:
             console.print("\n[yellow]Execution paused. Use 'resume' to continue.[/yellow]")
             return 130
+        finally:
+            await orchestrator.close()
     
     sys.exit(asyncio.run(run()))
 
@@ -134,13 +151,18 @@ def resume(ctx):
 @click.pass_context
 def run_phase(ctx, phase_id):
     """Run a specific phase."""
+    from orchestrator import Orchestrator
+    
     config_path = ctx.obj['config_path']
     
     async def run():
         orchestrator = Orchestrator(config_path)
         await orchestrator.initialize()
         
-        result = await orchestrator.run_phase(phase_id)
+        try:
+            result = await orchestrator.run_phase(phase_id)
+        finally:
+            await orchestrator.close()
         
         if result.success:
             console.print(f"[green]✓ Phase {phase_id} completed[/green]")
@@ -156,13 +178,21 @@ def run_phase(ctx, phase_id):
 @click.pass_context
 def status(ctx):
     """Show current execution status."""
+    from rich.panel import Panel
+    from rich.table import Table
+    from orchestrator import Orchestrator
+    from utils import format_duration
+    
     config_path = ctx.obj['config_path']
     
     async def show_status():
         orchestrator = Orchestrator(config_path)
         await orchestrator.initialize()
         
-        status = await orchestrator.get_status()
+        try:
+            status = await orchestrator.get_status()
+        finally:
+            await orchestrator.close()
         state = status['state']
         stats = status['stats']
         resume_info = status['resume_info']
@@ -219,6 +249,8 @@ def status(ctx):
 @click.pass_context
 def reset(ctx):
     """Reset all state and start fresh."""
+    from state_manager import StateManager
+    
     async def do_reset():
         state_manager = StateManager(Path("state"))
         await state_manager.reset_state()
@@ -231,21 +263,29 @@ def reset(ctx):
 @click.pass_context
 def dashboard(ctx):
     """Regenerate dashboard data."""
+    from analytics_collector import AnalyticsCollector
+    from utils import load_yaml
+    
     config_path = ctx.obj['config_path']
     
     async def regenerate():
         config = load_yaml(config_path)
         analytics = AnalyticsCollector(config.get("analytics", {}).get("database_path", "state/analytics.db"))
-        await analytics.initialize_db()
         
         from dashboard_generator import DashboardGenerator
         from state_manager import StateManager
         
         dashboard = DashboardGenerator(config, analytics)
         state_manager = StateManager(Path("state"))
-        state = await state_manager.get_state()
+        _, state = await asyncio.gather(
+            analytics.initialize_db(),
+            state_manager.get_state()
+        )
         
-        await dashboard.update_all(state)
+        try:
+            await dashboard.update_all(state)
+        finally:
+            await analytics.aclose()
         
         console.print("[green]Dashboard regenerated[/green]")
     
@@ -256,13 +296,22 @@ def dashboard(ctx):
 @click.pass_context
 def list_phases(ctx):
     """List all phases with their status."""
+    from rich.table import Table
+    from models import ModuleConfig
+    from state_manager import StateManager
+    from utils import load_yaml
+    
     config_path = ctx.obj['config_path']
     
     async def show_phases():
-        orchestrator = Orchestrator(config_path)
-        await orchestrator.initialize()
+        # Only the phase definitions and saved state are needed here, so skip
+        # building the orchestrator (analytics DB, Claude client, git, Xcode)
+        config = load_yaml(config_path)
+        phases_config = load_yaml(Path("config/phases.yaml"))
+        modules = [ModuleConfig.from_dict(m) for m in phases_config.get("modules", [])]
         
-        state = await orchestrator.state_manager.get_state()
+        state_manager = StateManager(Path(config.get("state_dir", "state")))
+        state = await state_manager.get_state()
         
         table = Table(title="Phases")
         table.add_column("ID", style="cyan")
@@ -271,7 +320,7 @@ def list_phases(ctx):
         table.add_column("Tests", justify="center")
         table.add_column("Screenshot", justify="center")
         
-        for module in orchestrator.modules:
+        for module in modules:
             table.add_row(f"[bold]{module.id}[/bold]", f"[bold]{module.name}[/bold]", "", "", "")
             
             for phase in module.phases:
@@ -299,10 +348,15 @@ def list_phases(ctx):
 @click.pass_context
 def export(ctx, output):
     """Export analytics to JSON file."""
+    from analytics_collector import AnalyticsCollector
+    
     async def do_export():
         analytics = AnalyticsCollector("state/analytics.db")
         await analytics.initialize_db()
-        await analytics.export_to_json(Path(output))
+        try:
+            await analytics.export_to_json(Path(output))
+        finally:
+            await analytics.aclose()
         console.print(f"[green]Analytics exported to {output}[/green]")
     
     asyncio.run(do_export())
@@ -3,12 +3,22 @@ Manual Intervention Detector.
 Identifies build/test errors that require manual intervention and cannot be fixed by Claude.
 """
 
-from dataclasses import dataclass
-from typing import Optional
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Optional, TextIO
 from models import BuildError, TestFailure
 
+# Aho-Corasick matches every manual pattern in one pass over the error text;
+# fall back to per-pattern substring checks when pyahocorasick isn't installed.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
-@dataclass
+
+@dataclass(slots=True)
 class ManualInterventionRequired:
     """Represents a situation requiring manual intervention."""
     category: str  # e.g., "xcode_target", "dependency", "signing"
@@ -17,6 +27,14 @@ class ManualInterventionRequired:
     instructions: list[str]
     affected_files: list[str]
     is_blocking: bool = True  # If True, automation should stop
+    # Instructions preformatted for format_intervention_message; filled in for
+    # the built-in patterns, computed on demand otherwise
+    instructions_text: str = field(default="", repr=False, compare=False)
+
+
+def _format_instructions(instructions: list[str]) -> str:
+    """Render instructions as indented lines, each preceded by a newline."""
+    return "".join(f"\n    {instruction}" for instruction in instructions)
 
 
 class ManualInterventionDetector:
@@ -206,6 +224,42 @@ class ManualInterventionDetector:
         "generic parameter",
     ]
 
+    REPEATED_FAILURE_INSTRUCTIONS = [
+        "1. Review the error messages below",
+        "2. Check if files need to be added to correct Xcode target",
+        "3. Check for any missing dependencies or configurations",
+        "4. Try building manually in Xcode to get more context",
+        "5. Fix the issue and resume automation"
+    ]
+
+    # Built once at import: a prebuilt result per pattern group (only
+    # affected_files varies per match), plus a flat (lowercased pattern,
+    # group index) scan list in MANUAL_PATTERNS order
+    _TEMPLATES = tuple(
+        ManualInterventionRequired(
+            category=info["category"],
+            title=info["title"],
+            description=info["description"],
+            instructions=info["instructions"],
+            affected_files=[],
+            instructions_text=_format_instructions(info["instructions"])
+        )
+        for info in MANUAL_PATTERNS
+    )
+    _PATTERN_INDEX = tuple(
+        (pattern.lower(), index)
+        for index, info in enumerate(MANUAL_PATTERNS)
+        for pattern in info["patterns"]
+    )
+    _REPEATED_FAILURE_TEXT = _format_instructions(REPEATED_FAILURE_INSTRUCTIONS)
+    _RECOVERABLE_RE = re.compile("|".join(re.escape(p.lower()) for p in RECOVERABLE_PATTERNS))
+
+    # Most distinct error signatures tracked at once (least recently seen are dropped)
+    MAX_TRACKED_SIGNATURES = 64
+
+    # Lazily built automaton mapping lowercased patterns to MANUAL_PATTERNS indexes
+    _automaton = None
+
     def __init__(self, max_same_error_retries: int = 3):
         """
         Initialize detector.
@@ -215,7 +269,12 @@ class ManualInterventionDetector:
                                    considering it might need manual intervention
         """
         self.max_same_error_retries = max_same_error_retries
-        self._error_counts: dict[str, int] = {}
+        self._error_counts: OrderedDict[str, int] = OrderedDict()
+
+        # Verdicts for the most recent error set, reused while the errors repeat
+        self._last_errors_key: Optional[tuple] = None
+        self._last_signature: Optional[str] = None
+        self._last_has_recoverable: Optional[bool] = None
 
     def check_build_errors(self, errors: list[BuildError]) -> Optional[ManualInterventionRequired]:
         """
@@ -230,26 +289,13 @@ class ManualInterventionDetector:
         if not errors:
             return None
 
-        affected_files = []
-
         for error in errors:
-            error_text = f"{error.message} {error.file_path or ''}"
+            error_text = f"{error.message_lower} {(error.file_path or '').lower()}"
 
             # Check against manual intervention patterns
-            for pattern_info in self.MANUAL_PATTERNS:
-                for pattern in pattern_info["patterns"]:
-                    if pattern.lower() in error_text.lower():
-                        if error.file_path:
-                            affected_files.append(error.file_path)
-
-                        return ManualInterventionRequired(
-                            category=pattern_info["category"],
-                            title=pattern_info["title"],
-                            description=pattern_info["description"],
-                            instructions=pattern_info["instructions"],
-                            affected_files=list(set(affected_files)),
-                            is_blocking=True
-                        )
+            template = self._match_manual_pattern(error_text)
+            if template:
+                return replace(template, affected_files=[error.file_path] if error.file_path else [])
 
         return None
 
@@ -269,22 +315,44 @@ class ManualInterventionDetector:
         # Test failures are generally fixable by Claude unless they indicate
         # configuration issues
         for failure in failures:
-            error_text = failure.failure_message or ""
-
-            for pattern_info in self.MANUAL_PATTERNS:
-                for pattern in pattern_info["patterns"]:
-                    if pattern.lower() in error_text.lower():
-                        return ManualInterventionRequired(
-                            category=pattern_info["category"],
-                            title=pattern_info["title"],
-                            description=pattern_info["description"],
-                            instructions=pattern_info["instructions"],
-                            affected_files=[failure.file_path] if failure.file_path else [],
-                            is_blocking=True
-                        )
+            template = self._match_manual_pattern((failure.failure_message or "").lower())
+            if template:
+                return replace(template, affected_files=[failure.file_path] if failure.file_path else [])
 
         return None
 
+    @classmethod
+    def _get_automaton(cls):
+        """Build (once) the Aho-Corasick automaton over all manual patterns."""
+        if cls._automaton is None:
+            automaton = ahocorasick.Automaton()
+            for pattern, index in cls._PATTERN_INDEX:
+                # Keep the earliest group when a pattern appears in several
+                if pattern not in automaton:
+                    automaton.add_word(pattern, index)
+            automaton.make_automaton()
+            cls._automaton = automaton
+        return cls._automaton
+
+    def _match_manual_pattern(self, error_text: str) -> Optional[ManualInterventionRequired]:
+        """
+        Find the first MANUAL_PATTERNS entry (in list order) matching the text.
+
+        Args:
+            error_text: Already-lowercased text to scan
+
+        Returns:
+            The prebuilt result for the matching group, or None
+        """
+        if ahocorasick is not None:
+            index = min((i for _, i in self._get_automaton().iter(error_text)), default=None)
+            return None if index is None else self._TEMPLATES[index]
+
+        for pattern, index in self._PATTERN_INDEX:
+            if pattern in error_text:
+                return self._TEMPLATES[index]
+        return None
+
     def check_repeated_errors(self, errors: list[BuildError], iteration: int) -> Optional[ManualInterventionRequired]:
         """
         Check if we're stuck on the same errors repeatedly.
@@ -302,37 +370,36 @@ class ManualInterventionDetector:
         if not errors or iteration < self.max_same_error_retries:
             return None
 
-        # Create a signature of current errors
-        error_sig = self._get_error_signature(errors)
+        # Create a signature of current errors (unchanged errors reuse the last one)
+        errors_key = tuple((e.file_path, e.line_number, e.message) for e in errors)
+        if errors_key != self._last_errors_key:
+            self._last_errors_key = errors_key
+            self._last_signature = self._get_error_signature(errors)
+            self._last_has_recoverable = None
+        error_sig = self._last_signature
 
-        # Count occurrences
+        # Count occurrences, keeping only the most recently seen signatures
         self._error_counts[error_sig] = self._error_counts.get(error_sig, 0) + 1
+        self._error_counts.move_to_end(error_sig)
+        if len(self._error_counts) > self.MAX_TRACKED_SIGNATURES:
+            self._error_counts.popitem(last=False)
 
         if self._error_counts[error_sig] >= self.max_same_error_retries:
             # Check if any of these are recoverable patterns
-            has_recoverable = False
-            for error in errors:
-                for pattern in self.RECOVERABLE_PATTERNS:
-                    if pattern.lower() in (error.message or "").lower():
-                        has_recoverable = True
-                        break
-                if has_recoverable:
-                    break
-
-            if not has_recoverable:
+            if self._last_has_recoverable is None:
+                self._last_has_recoverable = any(
+                    self._RECOVERABLE_RE.search(error.message_lower) for error in errors
+                )
+
+            if not self._last_has_recoverable:
                 return ManualInterventionRequired(
                     category="repeated_failure",
                     title="Repeated Build Failures",
                     description=f"The same errors have occurred {self._error_counts[error_sig]} times.",
-                    instructions=[
-                        "1. Review the error messages below",
-                        "2. Check if files need to be added to correct Xcode target",
-                        "3. Check for any missing dependencies or configurations",
-                        "4. Try building manually in Xcode to get more context",
-                        "5. Fix the issue and resume automation"
-                    ],
+                    instructions=list(self.REPEATED_FAILURE_INSTRUCTIONS),
                     affected_files=[e.file_path for e in errors if e.file_path],
-                    is_blocking=True
+                    is_blocking=True,
+                    instructions_text=self._REPEATED_FAILURE_TEXT
                 )
 
         return None
@@ -343,12 +410,24 @@ class ManualInterventionDetector:
 
     def _get_error_signature(self, errors: list[BuildError]) -> str:
         """Create a signature string from errors for comparison."""
-        # Sort and concatenate key error info to create comparable signature
-        parts = sorted([
-            f"{e.file_path}:{e.line_number}:{e.message[:50] if e.message else ''}"
-            for e in errors
-        ])
-        return "|".join(parts[:5])  # Only use first 5 errors for signature
+        # Hash every error's location and message prefix in a stable order
+        digest = hashlib.blake2b(digest_size=16)
+        for e in sorted(errors, key=lambda e: (e.file_path or "", e.line_number or 0, e.message or "")):
+            digest.update(f"{e.file_path}:{e.line_number}:{(e.message or '')[:50]}\0".encode())
+        return digest.hexdigest()
+
+    def write_intervention_message(self, stream: TextIO, intervention: ManualInterventionRequired,
+                                   errors: list = None):
+        """
+        Write the formatted intervention message to a stream in a single write.
+
+        Args:
+            stream: Text stream to write to (e.g. sys.stdout)
+            intervention: The intervention details
+            errors: Optional list of actual errors for context
+        """
+        stream.write(self.format_intervention_message(intervention, errors) + "\n")
+        stream.flush()
 
     def format_intervention_message(self, intervention: ManualInterventionRequired,
                                    errors: list = None) -> str:
@@ -362,48 +441,45 @@ class ManualInterventionDetector:
         Returns:
             Formatted message string
         """
-        lines = [
-            "",
-            "=" * 70,
-            "  MANUAL INTERVENTION REQUIRED",
-            "=" * 70,
-            "",
-            f"  Category: {intervention.category}",
-            f"  Issue: {intervention.title}",
-            "",
-            f"  {intervention.description}",
-            "",
-        ]
+        rule = "=" * 70
 
+        affected_block = ""
         if intervention.affected_files:
-            lines.append("  Affected files:")
-            for f in intervention.affected_files[:5]:
-                lines.append(f"    - {f}")
+            shown_files = intervention.affected_files[:5]
+            affected_block = "  Affected files:\n" + "".join(f"    - {f}\n" for f in shown_files)
             if len(intervention.affected_files) > 5:
-                lines.append(f"    ... and {len(intervention.affected_files) - 5} more")
-            lines.append("")
+                affected_block += f"    ... and {len(intervention.affected_files) - 5} more\n"
+            affected_block += "\n"
 
-        lines.append("  Steps to fix:")
-        for instruction in intervention.instructions:
-            lines.append(f"    {instruction}")
+        instructions_block = (intervention.instructions_text
+                              or _format_instructions(intervention.instructions))
 
+        errors_block = ""
         if errors:
-            lines.append("")
-            lines.append("  Error details:")
+            error_lines = []
             for error in errors[:5]:
                 if hasattr(error, 'message'):
                     err_loc = f"{error.file_path}:{error.line_number}" if error.file_path else ""
-                    lines.append(f"    [{err_loc}] {error.message[:100]}")
+                    error_lines.append(f"    [{err_loc}] {error.message[:100]}")
                 elif hasattr(error, 'failure_message'):
-                    lines.append(f"    {error.failure_message[:100]}")
-
-        lines.extend([
-            "",
-            "=" * 70,
-            "  Automation paused. Fix the issue and resume with:",
-            "    cd automation && python scripts/main.py",
-            "=" * 70,
-            ""
-        ])
-
-        return "\n".join(lines)
+                    error_lines.append(f"    {error.failure_message[:100]}")
+            errors_block = "\n\n  Error details:" + "".join(f"\n{line}" for line in error_lines)
+
+        return (
+            f"\n{rule}\n"
+            f"  MANUAL INTERVENTION REQUIRED\n"
+            f"{rule}\n"
+            f"\n"
+            f"  Category: {intervention.category}\n"
+            f"  Issue: {intervention.title}\n"
+            f"\n"
+            f"  {intervention.description}\n"
+            f"\n"
+            f"{affected_block}"
+            f"  Steps to fix:{instructions_block}{errors_block}\n"
+            f"\n"
+            f"{rule}\n"
+            f"  Automation paused. Fix the issue and resume with:\n"
+            f"    cd automation && python scripts/main.py\n"
+            f"{rule}\n"
+        )
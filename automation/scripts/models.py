@@ -3,12 +3,36 @@ Data models for the automation system.
 Contains dataclasses and enums for state management.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional
-import json
+from typing import Any, Optional
+
+import orjson
+
+# ciso8601 is a C ISO-8601 parser; fall back to the stdlib when not installed
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    _parse_iso = datetime.fromisoformat
+
+
+def _serialize_default(obj: Any) -> Any:
+    """orjson fallback for types it does not serialize natively."""
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def serialize(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize models (dataclasses, enums, datetimes) straight to JSON bytes.
+    
+    orjson handles dataclass instances natively, so no intermediate dicts are built.
+    """
+    option = orjson.OPT_INDENT_2 if indent else 0
+    return orjson.dumps(obj, default=_serialize_default, option=option)
 
 
 class Step(str, Enum):
@@ -40,8 +64,18 @@ class PhaseStatus(str, Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
-class BuildError:
+# Value -> member maps so loading state skips the Enum __call__ machinery
+_STEP_BY_VALUE = {step.value: step for step in Step}
+_STATUS_BY_VALUE = {status.value: status for status in Status}
+
+
+class _MessageLowerSlot:
+    """Extra slot for BuildError's cached lowercase message, kept out of fields()."""
+    __slots__ = ("_message_lower",)
+
+
+@dataclass(slots=True)
+class BuildError(_MessageLowerSlot):
     """Represents a build error from xcodebuild."""
     file_path: str
     line_number: Optional[int]
@@ -49,14 +83,14 @@ class BuildError:
     message: str
     error_type: str = "error"  # error, warning
     
-    def to_dict(self) -> dict:
-        return {
-            "file_path": self.file_path,
-            "line_number": self.line_number,
-            "column_number": self.column_number,
-            "message": self.message,
-            "error_type": self.error_type
-        }
+    @property
+    def message_lower(self) -> str:
+        """Lowercased message, computed once for the intervention pattern matchers."""
+        try:
+            return self._message_lower
+        except AttributeError:
+            self._message_lower = (self.message or "").lower()
+            return self._message_lower
     
     def __str__(self) -> str:
         loc = f"{self.file_path}"
@@ -67,7 +101,7 @@ class BuildError:
         return f"{loc}: {self.error_type}: {self.message}"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestFailure:
     """Represents a test failure."""
     test_name: str
@@ -76,20 +110,11 @@ class TestFailure:
     file_path: Optional[str] = None
     line_number: Optional[int] = None
     
-    def to_dict(self) -> dict:
-        return {
-            "test_name": self.test_name,
-            "test_class": self.test_class,
-            "failure_message": self.failure_message,
-            "file_path": self.file_path,
-            "line_number": self.line_number
-        }
-    
     def __str__(self) -> str:
         return f"{self.test_class}.{self.test_name}: {self.failure_message}"
 
 
-@dataclass
+@dataclass(slots=True)
 class BuildResult:
     """Result of a build operation."""
     success: bool
@@ -105,12 +130,12 @@ class BuildResult:
             "duration_seconds": self.duration_seconds,
             "error_count": len(self.errors),
             "warning_count": len(self.warnings),
-            "errors": [e.to_dict() for e in self.errors],
-            "warnings": [w.to_dict() for w in self.warnings]
+            "errors": [asdict(e) for e in self.errors],
+            "warnings": [asdict(w) for w in self.warnings]
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     """Result of a test operation."""
     success: bool
@@ -131,11 +156,11 @@ class TestResult:
             "passed_tests": self.passed_tests,
             "failed_tests": self.failed_tests,
             "skipped_tests": self.skipped_tests,
-            "failures": [f.to_dict() for f in self.failures]
+            "failures": [asdict(f) for f in self.failures]
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FileChange:
     """Represents a file change from Claude response."""
     path: str
@@ -150,7 +175,7 @@ class FileChange:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ClaudeResponse:
     """Response from Claude API/CLI."""
     success: bool
@@ -172,7 +197,7 @@ class ClaudeResponse:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class PhaseConfig:
     """Configuration for a single phase."""
     id: str
@@ -194,20 +219,9 @@ class PhaseConfig:
             tests_required=data.get("tests_required", True),
             screenshot=data.get("screenshot", False)
         )
-    
-    def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "prompt_file": self.prompt_file,
-            "description": self.description,
-            "expected_files": self.expected_files,
-            "tests_required": self.tests_required,
-            "screenshot": self.screenshot
-        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ModuleConfig:
     """Configuration for a module (group of phases)."""
     id: str
@@ -224,17 +238,9 @@ class ModuleConfig:
             description=data.get("description", ""),
             phases=phases
         )
-    
-    def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "phases": [p.to_dict() for p in self.phases]
-        }
 
 
-@dataclass
+@dataclass(slots=True)
 class PhaseResult:
     """Result of executing a phase."""
     phase_id: str
@@ -247,23 +253,9 @@ class PhaseResult:
     screenshot_path: Optional[str] = None
     commit_hash: Optional[str] = None
     error_message: Optional[str] = None
-    
-    def to_dict(self) -> dict:
-        return {
-            "phase_id": self.phase_id,
-            "success": self.success,
-            "iterations": self.iterations,
-            "duration_seconds": self.duration_seconds,
-            "build_errors_fixed": self.build_errors_fixed,
-            "test_failures_fixed": self.test_failures_fixed,
-            "files_changed": self.files_changed,
-            "screenshot_path": self.screenshot_path,
-            "commit_hash": self.commit_hash,
-            "error_message": self.error_message
-        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionState:
     """Current execution state (persisted for resume)."""
     current_module: Optional[str] = None
@@ -298,44 +290,55 @@ class ExecutionState:
     # Claude session persistence
     claude_session_id: Optional[str] = None
     
+    # Serialized form from the last to_dict, plus fields assigned since then
+    _dict_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _dirty: set = field(default_factory=set, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value):
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            dirty = getattr(self, "_dirty", None)
+            if dirty is not None:
+                dirty.add(name)
+    
+    def _serialize_field(self, name: str):
+        """JSON-ready value of a single field."""
+        value = getattr(self, name)
+        if name == "current_step":
+            return value.value if value else None
+        if name == "status":
+            return value.value
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+    
     def to_dict(self) -> dict:
-        return {
-            "current_module": self.current_module,
-            "current_phase": self.current_phase,
-            "current_step": self.current_step.value if self.current_step else None,
-            "iteration": self.iteration,
-            "status": self.status.value,
-            "completed_phases": self.completed_phases,
-            "failed_phases": self.failed_phases,
-            "is_rate_limited": self.is_rate_limited,
-            "rate_limit_until": self.rate_limit_until.isoformat() if self.rate_limit_until else None,
-            "consecutive_rate_limits": self.consecutive_rate_limits,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "last_updated": self.last_updated.isoformat() if self.last_updated else None,
-            "last_error": self.last_error,
-            "consecutive_failures": self.consecutive_failures,
-            "total_iterations": self.total_iterations,
-            "total_build_errors": self.total_build_errors,
-            "total_test_failures": self.total_test_failures,
-            "total_rate_limits": self.total_rate_limits,
-            "claude_session_id": self.claude_session_id
-        }
+        """Serialize state, re-converting only fields assigned since the last call."""
+        cached = self._dict_cache
+        if cached is None:
+            cached = {name: self._serialize_field(name) for name in _EXECUTION_STATE_FIELDS}
+            object.__setattr__(self, "_dict_cache", cached)
+        else:
+            for name in self._dirty:
+                cached[name] = self._serialize_field(name)
+        self._dirty.clear()
+        return dict(cached)
     
     @classmethod
     def from_dict(cls, data: dict) -> "ExecutionState":
         state = cls()
         state.current_module = data.get("current_module")
         state.current_phase = data.get("current_phase")
-        state.current_step = Step(data["current_step"]) if data.get("current_step") else Step.GENERATE
+        state.current_step = _STEP_BY_VALUE.get(data.get("current_step"), Step.GENERATE)
         state.iteration = data.get("iteration", 0)
-        state.status = Status(data.get("status", "not_started"))
+        state.status = _STATUS_BY_VALUE.get(data.get("status"), Status.NOT_STARTED)
         state.completed_phases = data.get("completed_phases", [])
         state.failed_phases = data.get("failed_phases", [])
         state.is_rate_limited = data.get("is_rate_limited", False)
-        state.rate_limit_until = datetime.fromisoformat(data["rate_limit_until"]) if data.get("rate_limit_until") else None
+        state.rate_limit_until = _parse_iso(data["rate_limit_until"]) if data.get("rate_limit_until") else None
         state.consecutive_rate_limits = data.get("consecutive_rate_limits", 0)
-        state.started_at = datetime.fromisoformat(data["started_at"]) if data.get("started_at") else None
-        state.last_updated = datetime.fromisoformat(data["last_updated"]) if data.get("last_updated") else None
+        state.started_at = _parse_iso(data["started_at"]) if data.get("started_at") else None
+        state.last_updated = _parse_iso(data["last_updated"]) if data.get("last_updated") else None
         state.last_error = data.get("last_error")
         state.consecutive_failures = data.get("consecutive_failures", 0)
         state.total_iterations = data.get("total_iterations", 0)
@@ -346,7 +349,11 @@ class ExecutionState:
         return state
 
 
-@dataclass
+# Persisted ExecutionState fields, in serialization order
+_EXECUTION_STATE_FIELDS = tuple(f.name for f in fields(ExecutionState) if not f.name.startswith("_"))
+
+
+@dataclass(slots=True)
 class DashboardStatus:
     """Status data for the dashboard."""
     last_updated: datetime
@@ -357,15 +364,3 @@ class DashboardStatus:
     current_iteration: int
     rate_limit_status: dict
     statistics: dict
-    
-    def to_dict(self) -> dict:
-        return {
-            "last_updated": self.last_updated.isoformat(),
-            "current_phase": self.current_phase,
-            "current_step": self.current_step,
-            "status": self.status,
-            "overall_progress": self.overall_progress,
-            "current_iteration": self.current_iteration,
-            "rate_limit_status": self.rate_limit_status,
-            "statistics": self.statistics
-        }
@@ -4,17 +4,20 @@ Coordinates the entire automation process.
 """
 
 import asyncio
+import re
 import sys
 import select
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import aiofiles
+
 from models import (
     ExecutionState, Step, Status, PhaseConfig, ModuleConfig,
-    PhaseResult, ClaudeResponse
+    PhaseResult, ClaudeResponse, BuildError
 )
-from utils import load_yaml, load_text, save_text, format_duration
+from utils import load_yaml, format_duration
 from logger import get_logger, setup_logger
 from state_manager import StateManager
 from analytics_collector import AnalyticsCollector
@@ -30,6 +33,9 @@ from manual_intervention_detector import ManualInterventionDetector, ManualInter
 class Orchestrator:
     """Main workflow orchestrator."""
     
+    # Marks build-like error lines in test output (matched without lowercasing each line)
+    _TEST_OUTPUT_ERROR_RE = re.compile("error:", re.IGNORECASE)
+    
     def __init__(self, config_path: Path = None):
         # Load configuration
         config_path = config_path or Path("config/config.yaml")
@@ -48,13 +54,11 @@ class Orchestrator:
         self.phases_config = load_yaml(phases_path)
         self.modules = [ModuleConfig.from_dict(m) for m in self.phases_config.get("modules", [])]
         
-        # Build phase lookup
-        self._phase_lookup = {}
-        self._module_lookup = {}
+        # Build phase lookup: phase ID -> (phase, owning module ID)
+        self._phase_info: dict[str, tuple[PhaseConfig, str]] = {}
         for module in self.modules:
             for phase in module.phases:
-                self._phase_lookup[phase.id] = phase
-                self._module_lookup[phase.id] = module.id
+                self._phase_info[phase.id] = (phase, module.id)
         
         # Initialize components
         self.state_manager = StateManager(Path(self.config.get("state_dir", "state")))
@@ -83,13 +87,26 @@ class Orchestrator:
         self.max_retries_per_phase = automation_config.get("max_retries_per_phase", 15)
         self.pause_between_phases = automation_config.get("pause_between_phases_seconds", 5)
         self.confirmation_timeout = automation_config.get("confirmation_timeout_seconds", 20)
+        
+        # Prompt text by prompt_file; prompts don't change during a run
+        self._prompt_cache: dict[str, str] = {}
     
     async def initialize(self):
         """Initialize all components."""
-        await self.analytics.initialize_db()
-        await self.state_manager.load_state()
+        await asyncio.gather(
+            self.analytics.initialize_db(),
+            self.state_manager.load_state()
+        )
         self.logger.info("Orchestrator initialized")
     
+    async def close(self):
+        """Release resources held by components."""
+        await self.claude.aclose()
+        await self.git.aclose()
+        # Before analytics: the final status write reads stats from it
+        await self.dashboard.aclose()
+        await self.analytics.aclose()
+    
     async def wait_for_user_confirmation(self, phase_name: str) -> bool:
         """
         Wait for user confirmation to continue or terminate.
@@ -102,29 +119,63 @@ class Orchestrator:
         print(f"Press 'q' + Enter to quit, or wait {self.confirmation_timeout}s to continue...")
         print(f"{'='*60}")
         
-        # Use asyncio to handle timeout
-        loop = asyncio.get_event_loop()
+        user_input = await self._read_stdin_line(self.confirmation_timeout)
+        if user_input is not None:
+            if user_input in ['q', 'quit', 'exit', 'stop']:
+                self.logger.info("User requested termination")
+                return False
+            else:
+                # Any other input (including Enter) continues
+                return True
+        
+        self.logger.info(f"No input after {self.confirmation_timeout}s, continuing...")
+        return True
+    
+    async def _read_stdin_line(self, timeout: float) -> Optional[str]:
+        """
+        Wait up to timeout seconds for a line on stdin.
+        
+        Returns:
+            The stripped, lowercased line, or None on timeout
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def on_stdin():
+            if not future.done():
+                future.set_result(sys.stdin.readline().strip().lower())
+        
+        # Let the event loop's selector wake us when stdin is readable
+        try:
+            fd = sys.stdin.fileno()
+            loop.add_reader(fd, on_stdin)
+        except (AttributeError, OSError, ValueError, NotImplementedError):
+            # No selectable stdin (e.g. Windows proactor loop): poll instead
+            return await self._poll_stdin_line(timeout)
+        
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            loop.remove_reader(fd)
+    
+    async def _poll_stdin_line(self, timeout: float) -> Optional[str]:
+        """Fallback for _read_stdin_line that checks stdin every 0.5s."""
+        loop = asyncio.get_running_loop()
         
         def check_input():
             if select.select([sys.stdin], [], [], 0)[0]:
                 return sys.stdin.readline().strip().lower()
             return None
         
-        start_time = asyncio.get_event_loop().time()
-        while asyncio.get_event_loop().time() - start_time < self.confirmation_timeout:
-            # Check for input in a non-blocking way
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
             user_input = await loop.run_in_executor(None, check_input)
             if user_input is not None:
-                if user_input in ['q', 'quit', 'exit', 'stop']:
-                    self.logger.info("User requested termination")
-                    return False
-                else:
-                    # Any other input (including Enter) continues
-                    return True
+                return user_input
             await asyncio.sleep(0.5)
-        
-        self.logger.info(f"No input after {self.confirmation_timeout}s, continuing...")
-        return True
+        return None
 
     async def _wait_with_countdown(self, wait_seconds: int, reason: str = "Waiting"):
         """
@@ -175,13 +226,16 @@ class Orchestrator:
         else:
             interval = 10
 
+        # Track a monotonic deadline so timer slack doesn't accumulate across ticks
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait_seconds
         remaining = wait_seconds
         while remaining > 0:
-            sleep_time = min(interval, remaining)
-            await asyncio.sleep(sleep_time)
-            remaining -= sleep_time
+            await asyncio.sleep(min(interval, remaining))
+            remaining = deadline - loop.time()
 
-            if remaining > 0:
+            if round(remaining) > 0:
+                remaining = round(remaining)
                 days, remainder = divmod(remaining, 86400)
                 hours, remainder = divmod(remainder, 3600)
                 mins, secs = divmod(remainder, 60)
@@ -208,11 +262,13 @@ class Orchestrator:
     
     def get_phase(self, phase_id: str) -> Optional[PhaseConfig]:
         """Get phase by ID."""
-        return self._phase_lookup.get(phase_id)
+        info = self._phase_info.get(phase_id)
+        return info[0] if info else None
     
     def get_module_id(self, phase_id: str) -> Optional[str]:
         """Get module ID for a phase."""
-        return self._module_lookup.get(phase_id)
+        info = self._phase_info.get(phase_id)
+        return info[1] if info else None
     
     async def run_all(self, resume: bool = True) -> bool:
         """
@@ -229,8 +285,7 @@ class Orchestrator:
         if resume and state.status in [Status.PAUSED, Status.RATE_LIMITED, Status.RUNNING]:
             self.logger.info(f"Resuming from phase {state.current_phase}, step {state.current_step}")
         else:
-            await self.state_manager.reset_state()
-            state = await self.state_manager.get_state()
+            state = await self.state_manager.reset_state()
             self.logger.info("Starting fresh execution")
         
         await self.state_manager.start_execution()
@@ -268,8 +323,8 @@ class Orchestrator:
     
     async def run_phase(self, phase_id: str) -> PhaseResult:
         """Run a single phase."""
-        phase = self.get_phase(phase_id)
-        if not phase:
+        info = self._phase_info.get(phase_id)
+        if not info:
             return PhaseResult(
                 phase_id=phase_id,
                 success=False,
@@ -278,16 +333,18 @@ class Orchestrator:
                 error_message=f"Phase {phase_id} not found"
             )
         
-        module_id = self.get_module_id(phase_id)
-        start_time = datetime.now()
+        phase, module_id = info
+        
+        # Durations are measured on the loop's monotonic clock
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
         
         self.logger.phase_start(phase_id, phase.name)
         
         # Initialize phase state
-        await self.state_manager.start_phase(module_id, phase)
+        state = await self.state_manager.start_phase(module_id, phase)
         await self.analytics.start_phase(phase_id, module_id, phase.name)
         
-        state = await self.state_manager.get_state()
         await self.dashboard.on_phase_start(state, phase)
         
         # Load prompt
@@ -300,9 +357,10 @@ class Orchestrator:
         build_errors_fixed = 0
         test_failures_fixed = 0
         
+        # StateManager mutates one ExecutionState in place, so `state` stays
+        # current across steps and retries without re-fetching
         while iteration <= self.max_retries_per_phase:
-            state = await self.state_manager.get_state()
-            step_start = datetime.now()
+            step_start = loop.time()
             
             try:
                 # GENERATE step
@@ -310,17 +368,14 @@ class Orchestrator:
                     self.logger.step_start("generate", iteration)
                     await self.analytics.record_iteration_start(phase_id, iteration, "generate")
                     
-                    # Apply proactive pacing delay before Claude call
-                    pacing_delay = self.rate_limiter.get_pacing_delay()
-                    if pacing_delay > 0:
-                        self.logger.debug(f"Applying pacing delay: {pacing_delay}s")
-                        await asyncio.sleep(pacing_delay)
+                    # Apply proactive pacing before Claude call
+                    await self.rate_limiter.acquire()
                     
                     response = await self.claude.send_prompt(prompt)
                     
                     if not response.success:
                         iteration = await self._handle_step_failure(
-                            phase_id, iteration, "generate", response.error or "Generation failed"
+                            phase, iteration, "generate", response.error or "Generation failed"
                         )
                         continue
                     
@@ -338,12 +393,11 @@ class Orchestrator:
                     self.logger.step_complete("generate")
                     await self.analytics.record_iteration_complete(
                         phase_id, iteration, "generate",
-                        (datetime.now() - step_start).total_seconds()
+                        loop.time() - step_start
                     )
                     
                     self.rate_limiter.record_success()
-                    await self.state_manager.advance_step(Step.BUILD)
-                    state = await self.state_manager.get_state()
+                    state = await self.state_manager.advance_step(Step.BUILD)
                 
                 # BUILD step
                 if state.current_step == Step.BUILD:
@@ -355,8 +409,7 @@ class Orchestrator:
                     if not result.success:
                         self.logger.step_failed("build", len(result.errors))
 
-                        for error in result.errors[:5]:
-                            self.logger.build_error(str(error))
+                        self.logger.build_errors([str(error) for error in result.errors[:5]])
 
                         # Check for manual intervention requirements
                         intervention = self.intervention_detector.check_build_errors(result.errors)
@@ -365,10 +418,9 @@ class Orchestrator:
 
                         if intervention and intervention.is_blocking:
                             # Manual intervention needed - stop automation
-                            message = self.intervention_detector.format_intervention_message(
-                                intervention, result.errors
+                            self.intervention_detector.write_intervention_message(
+                                sys.stdout, intervention, result.errors
                             )
-                            print(message)
                             self.logger.warning(f"Manual intervention required: {intervention.title}")
 
                             await self.state_manager.pause_execution()
@@ -386,7 +438,7 @@ class Orchestrator:
                         prompt = self.claude.build_fix_prompt(original_prompt, result.errors, "build")
 
                         iteration = await self._handle_step_failure(
-                            phase_id, iteration, "build",
+                            phase, iteration, "build",
                             f"{len(result.errors)} build errors"
                         )
                         await self.state_manager.advance_step(Step.GENERATE)
@@ -400,15 +452,13 @@ class Orchestrator:
                         phase_id, iteration, "build", result.duration_seconds
                     )
 
-                    await self.state_manager.advance_step(Step.TEST)
-                    state = await self.state_manager.get_state()
+                    state = await self.state_manager.advance_step(Step.TEST)
                 
                 # TEST step
                 if state.current_step == Step.TEST:
                     if not phase.tests_required:
                         self.logger.debug("Tests not required, skipping")
-                        await self.state_manager.advance_step(Step.SCREENSHOT)
-                        state = await self.state_manager.get_state()
+                        state = await self.state_manager.advance_step(Step.SCREENSHOT)
                     else:
                         self.logger.step_start("test", iteration)
                         await self.analytics.record_iteration_start(phase_id, iteration, "test")
@@ -418,11 +468,10 @@ class Orchestrator:
                         if not result.success:
                             self.logger.step_failed("test", len(result.failures))
 
-                            for failure in result.failures[:5]:
-                                self.logger.test_failure(
-                                    f"{failure.test_class}.{failure.test_name}",
-                                    failure.failure_message
-                                )
+                            self.logger.test_failures([
+                                (f"{failure.test_class}.{failure.test_name}", failure.failure_message)
+                                for failure in result.failures[:5]
+                            ])
 
                             # Check for manual intervention requirements
                             # Test failures can also indicate XCTest target issues
@@ -431,24 +480,24 @@ class Orchestrator:
                             # Also check build errors in test output (e.g., "No such module 'XCTest'")
                             if not intervention and result.error_output:
                                 # Parse error_output for build-like errors
-                                from models import BuildError
-                                test_build_errors = []
-                                for line in result.error_output.split('\n'):
-                                    if 'error:' in line.lower():
-                                        test_build_errors.append(BuildError(
-                                            file_path="",
-                                            line_number=None,
-                                            column_number=None,
-                                            message=line.strip()
-                                        ))
+                                error_re = self._TEST_OUTPUT_ERROR_RE
+                                test_build_errors = [
+                                    BuildError(
+                                        file_path="",
+                                        line_number=None,
+                                        column_number=None,
+                                        message=line.strip()
+                                    )
+                                    for line in result.error_output.split('\n')
+                                    if error_re.search(line)
+                                ]
                                 if test_build_errors:
                                     intervention = self.intervention_detector.check_build_errors(test_build_errors)
 
                             if intervention and intervention.is_blocking:
-                                message = self.intervention_detector.format_intervention_message(
-                                    intervention, result.failures
+                                self.intervention_detector.write_intervention_message(
+                                    sys.stdout, intervention, result.failures
                                 )
-                                print(message)
                                 self.logger.warning(f"Manual intervention required: {intervention.title}")
 
                                 await self.state_manager.pause_execution()
@@ -466,7 +515,7 @@ class Orchestrator:
                             prompt = self.claude.build_fix_prompt(original_prompt, result.failures, "test")
 
                             iteration = await self._handle_step_failure(
-                                phase_id, iteration, "test",
+                                phase, iteration, "test",
                                 f"{len(result.failures)} test failures"
                             )
                             await self.state_manager.advance_step(Step.GENERATE)
@@ -479,8 +528,7 @@ class Orchestrator:
                             phase_id, iteration, "test", result.duration_seconds
                         )
 
-                        await self.state_manager.advance_step(Step.SCREENSHOT)
-                        state = await self.state_manager.get_state()
+                        state = await self.state_manager.advance_step(Step.SCREENSHOT)
                 
                 # SCREENSHOT step
                 if state.current_step == Step.SCREENSHOT:
@@ -493,8 +541,7 @@ class Orchestrator:
                         if screenshot_path:
                             await self.analytics.record_screenshot(phase_id, str(screenshot_path))
                     
-                    await self.state_manager.advance_step(Step.COMMIT)
-                    state = await self.state_manager.get_state()
+                    state = await self.state_manager.advance_step(Step.COMMIT)
                 
                 # COMMIT step
                 if state.current_step == Step.COMMIT:
@@ -503,7 +550,7 @@ class Orchestrator:
                     if self.config["git"].get("auto_commit", True):
                         self.logger.step_start("commit", iteration)
                         
-                        duration = (datetime.now() - start_time).total_seconds()
+                        duration = loop.time() - start_time
                         commit_hash = await self.git.commit_phase(
                             phase, module_id, iteration, duration
                         )
@@ -514,17 +561,14 @@ class Orchestrator:
                                 phase_id, commit_hash, phase.name, len(changed_files)
                             )
                     
-                    await self.state_manager.advance_step(Step.COMPLETE)
-                    state = await self.state_manager.get_state()
+                    state = await self.state_manager.advance_step(Step.COMPLETE)
                 
                 # COMPLETE
                 if state.current_step == Step.COMPLETE:
-                    duration = (datetime.now() - start_time).total_seconds()
+                    duration = loop.time() - start_time
                     
                     await self.analytics.complete_phase(phase_id, iteration, duration)
-                    await self.state_manager.complete_phase(phase_id)
-                    
-                    state = await self.state_manager.get_state()
+                    state = await self.state_manager.complete_phase(phase_id)
                     await self.dashboard.on_phase_complete(state, phase)
                     
                     self.logger.phase_complete(phase_id, iteration, duration)
@@ -542,10 +586,9 @@ class Orchestrator:
                 wait_time = self.rate_limiter.record_hit(e.retry_after)
                 wait_until = self.rate_limiter.get_wait_until(wait_time)
 
-                await self.state_manager.record_rate_limit(wait_until)
+                state = await self.state_manager.record_rate_limit(wait_until)
                 await self.analytics.record_rate_limit(phase_id, wait_time)
 
-                state = await self.state_manager.get_state()
                 await self.dashboard.on_rate_limit(state, phase)
 
                 # Show countdown for rate limit wait
@@ -557,9 +600,7 @@ class Orchestrator:
             
             except KeyboardInterrupt:
                 self.logger.warning("Interrupted by user")
-                await self.state_manager.pause_execution()
-                
-                state = await self.state_manager.get_state()
+                state = await self.state_manager.pause_execution()
                 await self.dashboard.update_all(state, phase)
                 
                 raise
@@ -567,11 +608,10 @@ class Orchestrator:
             except Exception as e:
                 self.logger.exception(f"Unexpected error: {e}")
                 iteration = await self._handle_step_failure(
-                    phase_id, iteration, state.current_step.value, str(e)
+                    phase, iteration, state.current_step.value, str(e)
                 )
         
         # Max retries exceeded
-        duration = (datetime.now() - start_time).total_seconds()
         return await self._fail_phase(
             phase, module_id,
             f"Max retries ({self.max_retries_per_phase}) exceeded",
@@ -579,40 +619,58 @@ class Orchestrator:
         )
     
     async def _load_prompt(self, phase: PhaseConfig) -> Optional[str]:
-        """Load prompt from file."""
-        prompt_path = Path("phases") / phase.prompt_file
+        """Load prompt from file (read once per run, off the event loop)."""
+        cached = self._prompt_cache.get(phase.prompt_file)
+        if cached is not None:
+            return cached
         
-        if not prompt_path.exists():
+        prompt_path = Path("phases") / phase.prompt_file
+        try:
+            async with aiofiles.open(prompt_path, "r", encoding="utf-8") as f:
+                prompt = await f.read()
+        except FileNotFoundError:
             self.logger.error(f"Prompt file not found: {prompt_path}")
             return None
-        
-        try:
-            return load_text(prompt_path)
         except Exception as e:
             self.logger.error(f"Failed to load prompt: {e}")
             return None
+        
+        self._prompt_cache[phase.prompt_file] = prompt
+        return prompt
     
     async def _apply_file_changes(self, response: ClaudeResponse):
-        """Apply file changes from Claude response."""
+        """Apply file changes from Claude response, writing files concurrently."""
         project_root = Path(self.config["project"]["path"]).parent
         
-        for file_change in response.files:
-            file_path = project_root / file_change.path
-            
-            self.logger.progress(f"Writing: {file_change.path}")
-            
+        # One write per path, keeping the last entry as sequential writes would
+        file_changes = list({fc.path: fc for fc in response.files}.values())
+        
+        # Create every target directory up front so the writes can overlap
+        for directory in {(project_root / fc.path).parent for fc in file_changes}:
             try:
-                save_text(file_path, file_change.content)
-            except Exception as e:
-                self.logger.error(f"Failed to write {file_change.path}: {e}")
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                pass  # Reported by the write to that directory below
+        
+        async def write(file_change):
+            self.logger.progress(f"Writing: {file_change.path}")
+            async with aiofiles.open(project_root / file_change.path, "w", encoding="utf-8") as f:
+                await f.write(file_change.content)
+        
+        results = await asyncio.gather(
+            *(write(fc) for fc in file_changes), return_exceptions=True
+        )
+        for file_change, result in zip(file_changes, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to write {file_change.path}: {result}")
     
-    async def _handle_step_failure(self, phase_id: str, iteration: int, 
+    async def _handle_step_failure(self, phase: PhaseConfig, iteration: int, 
                                     step: str, error: str) -> int:
         """Handle a step failure and return new iteration number."""
-        await self.analytics.record_iteration_failed(phase_id, iteration, step, error)
+        await self.analytics.record_iteration_failed(phase.id, iteration, step, error)
         
         state = await self.state_manager.record_retry(Step.GENERATE)
-        await self.dashboard.on_iteration(state, self.get_phase(phase_id))
+        await self.dashboard.on_iteration(state, phase)
         
         # Apply delay after failure before retry
         failure_delay = self.rate_limiter.get_failure_delay()
@@ -623,14 +681,13 @@ class Orchestrator:
         return iteration + 1
     
     async def _fail_phase(self, phase: PhaseConfig, module_id: str, 
-                          error: str, start_time: datetime) -> PhaseResult:
-        """Handle phase failure."""
-        duration = (datetime.now() - start_time).total_seconds()
+                          error: str, start_time: float) -> PhaseResult:
+        """Handle phase failure (start_time is an event-loop clock reading)."""
+        duration = asyncio.get_running_loop().time() - start_time
         
-        await self.state_manager.fail_phase(phase.id, error)
+        state = await self.state_manager.fail_phase(phase.id, error)
         await self.analytics.fail_phase(phase.id, 0, duration)
         
-        state = await self.state_manager.get_state()
         await self.dashboard.on_phase_failed(state, phase)
         
         self.logger.phase_failed(phase.id, error)
@@ -645,11 +702,14 @@ class Orchestrator:
     
     async def get_status(self) -> dict:
         """Get current execution status."""
-        state = await self.state_manager.get_state()
-        stats = await self.analytics.get_overall_stats()
+        state, stats, resume_info = await asyncio.gather(
+            self.state_manager.get_state(),
+            self.analytics.get_overall_stats(),
+            self.state_manager.get_resume_info()
+        )
         
         return {
             "state": state.to_dict(),
             "stats": stats,
-            "resume_info": await self.state_manager.get_resume_info()
+            "resume_info": resume_info
         }
@@ -2,7 +2,9 @@
 Rate limit handling with exponential backoff.
 """
 
+import asyncio
 import random
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -23,6 +25,12 @@ class RateLimitHandler:
         self.delay_between_calls = automation_config.get("delay_between_claude_calls", 5)
         self.delay_after_failure = automation_config.get("delay_after_failure", 10)
         
+        # Token bucket: refills one call per delay_between_calls seconds and
+        # holds up to claude_call_burst calls
+        self.pacing_burst = max(1, automation_config.get("claude_call_burst", 1))
+        self._pacing_tokens = float(self.pacing_burst)
+        self._pacing_refilled_at = time.monotonic()
+        
         self.consecutive_hits = 0
         self.last_hit: Optional[datetime] = None
         self.last_success: Optional[datetime] = None
@@ -40,10 +48,12 @@ class RateLimitHandler:
         Returns:
             Number of seconds to wait
         """
-        # Use server-provided value if available
+        # Use server-provided value if available, plus up to 10% jitter so
+        # clients released by the same reset don't all retry in lockstep
         if retry_after and retry_after > 0:
-            self.logger.debug(f"Using server retry-after: {retry_after}s")
-            return retry_after
+            jitter = int(random.uniform(0, max(1.0, retry_after * 0.1)))
+            self.logger.debug(f"Using server retry-after: {retry_after}s (+{jitter}s jitter)")
+            return retry_after + jitter
         
         # Calculate exponential backoff
         wait = min(
@@ -127,24 +137,33 @@ class RateLimitHandler:
         self.last_success = None
         # Don't reset total_hits - keep for statistics
     
-    def get_pacing_delay(self) -> int:
+    async def acquire(self):
         """
-        Get recommended delay before next Claude call (proactive pacing).
+        Wait for a pacing token before the next Claude call (proactive pacing).
         
-        Returns:
-            Number of seconds to wait before making the next call
+        Sleeps only for the token deficit; returns immediately while the
+        bucket has capacity.
         """
-        if self.last_success is None:
-            return 0  # No delay for first call
-        
-        elapsed = (datetime.now() - self.last_success).total_seconds()
-        remaining = self.delay_between_calls - elapsed
+        if self.delay_between_calls <= 0:
+            return
+        
+        rate = 1 / self.delay_between_calls
+        now = time.monotonic()
+        self._pacing_tokens = min(
+            self.pacing_burst,
+            self._pacing_tokens + (now - self._pacing_refilled_at) * rate
+        )
+        self._pacing_refilled_at = now
         
-        if remaining > 0:
-            self.logger.debug(f"Pacing delay: {int(remaining)}s until next call allowed")
-            return int(remaining)
+        if self._pacing_tokens < 1:
+            delay = (1 - self._pacing_tokens) / rate
+            self.logger.debug(f"Pacing delay: {delay:.1f}s until next call allowed")
+            await asyncio.sleep(delay)
+            # The sleep earned exactly the missing fraction of a token
+            self._pacing_tokens = 1.0
+            self._pacing_refilled_at = now + delay
         
-        return 0
+        self._pacing_tokens -= 1
     
     def get_failure_delay(self) -> int:
         """
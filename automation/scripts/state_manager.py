@@ -3,14 +3,14 @@ State persistence and management.
 Handles saving/loading execution state for resume capability.
 """
 
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import aiofiles
+import orjson
 
-from models import ExecutionState, Step, Status, PhaseConfig
+from models import ExecutionState, Step, Status, PhaseConfig, serialize
 from logger import get_logger
 
 
@@ -31,8 +31,8 @@ class StateManager:
         """Load state from file or create new."""
         if self.state_file.exists():
             try:
-                async with aiofiles.open(self.state_file, "r") as f:
-                    data = json.loads(await f.read())
+                async with aiofiles.open(self.state_file, "rb") as f:
+                    data = orjson.loads(await f.read())
                 self._state = ExecutionState.from_dict(data)
                 self.logger.debug(f"Loaded state: phase={self._state.current_phase}, step={self._state.current_step}")
             except Exception as e:
@@ -50,8 +50,8 @@ class StateManager:
         
         self._state.last_updated = datetime.now()
         
-        async with aiofiles.open(self.state_file, "w") as f:
-            await f.write(json.dumps(self._state.to_dict(), indent=2))
+        async with aiofiles.open(self.state_file, "wb") as f:
+            await f.write(serialize(self._state.to_dict(), indent=True))
         
         self.logger.debug("State saved")
     
@@ -61,11 +61,12 @@ class StateManager:
             await self.load_state()
         return self._state
     
-    async def reset_state(self):
+    async def reset_state(self) -> ExecutionState:
         """Reset state to initial."""
         self._state = ExecutionState()
         await self.save_state()
         self.logger.info("State reset")
+        return self._state
     
     # State update methods
     
@@ -76,7 +77,7 @@ class StateManager:
         state.started_at = datetime.now()
         await self.save_state()
     
-    async def start_phase(self, module_id: str, phase: PhaseConfig):
+    async def start_phase(self, module_id: str, phase: PhaseConfig) -> ExecutionState:
         """Start a new phase."""
         state = await self.get_state()
         state.current_module = module_id
@@ -86,6 +87,7 @@ class StateManager:
         state.consecutive_failures = 0
         state.last_error = None
         await self.save_state()
+        return state
     
     async def advance_step(self, next_step: Step) -> ExecutionState:
         """Move to next step within phase."""
@@ -115,7 +117,7 @@ class StateManager:
         state.total_test_failures += count
         await self.save_state()
     
-    async def complete_phase(self, phase_id: str):
+    async def complete_phase(self, phase_id: str) -> ExecutionState:
         """Mark phase as complete."""
         state = await self.get_state()
         if phase_id not in state.completed_phases:
@@ -124,8 +126,9 @@ class StateManager:
         state.consecutive_failures = 0
         await self.save_state()
         await self._add_to_history(phase_id, success=True)
+        return state
     
-    async def fail_phase(self, phase_id: str, error: str):
+    async def fail_phase(self, phase_id: str, error: str) -> ExecutionState:
         """Mark phase as failed."""
         state = await self.get_state()
         if phase_id not in state.failed_phases:
@@ -134,8 +137,9 @@ class StateManager:
         state.consecutive_failures += 1
         await self.save_state()
         await self._add_to_history(phase_id, success=False, error=error)
+        return state
     
-    async def record_rate_limit(self, wait_until: datetime):
+    async def record_rate_limit(self, wait_until: datetime) -> ExecutionState:
         """Record rate limit hit."""
         state = await self.get_state()
         state.is_rate_limited = True
@@ -144,8 +148,9 @@ class StateManager:
         state.total_rate_limits += 1
         state.status = Status.RATE_LIMITED
         await self.save_state()
+        return state
     
-    async def clear_rate_limit(self):
+    async def clear_rate_limit(self) -> ExecutionState:
         """Clear rate limit status."""
         state = await self.get_state()
         state.is_rate_limited = False
@@ -153,12 +158,14 @@ class StateManager:
         state.consecutive_rate_limits = 0
         state.status = Status.RUNNING
         await self.save_state()
+        return state
     
-    async def pause_execution(self):
+    async def pause_execution(self) -> ExecutionState:
         """Pause execution."""
         state = await self.get_state()
         state.status = Status.PAUSED
         await self.save_state()
+        return state
     
     async def complete_execution(self):
         """Mark entire execution as complete."""
@@ -184,15 +191,15 @@ class StateManager:
         
         history["phases"].append(entry)
         
-        async with aiofiles.open(self.history_file, "w") as f:
-            await f.write(json.dumps(history, indent=2))
+        async with aiofiles.open(self.history_file, "wb") as f:
+            await f.write(serialize(history, indent=True))
     
     async def _load_history(self) -> dict:
         """Load history from file."""
         if self.history_file.exists():
             try:
-                async with aiofiles.open(self.history_file, "r") as f:
-                    return json.loads(await f.read())
+                async with aiofiles.open(self.history_file, "rb") as f:
+                    return orjson.loads(await f.read())
             except Exception:
                 pass
         return {"phases": []}
@@ -203,6 +203,8 @@ current_state.json
 history.json
 analytics.db
 analytics.db-journal
+analytics.db-wal
+analytics.db-shm
 EOF
 print_success "State .gitignore created"
 
@@ -256,14 +258,17 @@ status = {
 with open(data_dir / 'status.json', 'w') as f:
     json.dump(status, f, indent=2)
 
-with open(data_dir / 'history.json', 'w') as f:
-    json.dump({"phases": []}, f, indent=2)
-
-with open(data_dir / 'analytics.json', 'w') as f:
-    json.dump({"modules": [], "timeline": []}, f, indent=2)
+# History, analytics and screenshots share one file (see DashboardGenerator.update_dashboard)
+now = datetime.now().isoformat()
+dashboard = {
+    "last_updated": now,
+    "history": {"last_updated": now, "phases": []},
+    "analytics": {"exported_at": now, "overall": {}, "phases": [], "timeline": []},
+    "screenshots": {"last_updated": now, "screenshots": []}
+}
 
-with open(data_dir / 'screenshots.json', 'w') as f:
-    json.dump({"screenshots": []}, f, indent=2)
+with open(data_dir / 'dashboard.json', 'w') as f:
+    json.dump(dashboard, f, indent=2)
 
 print('Dashboard data initialized')
 EOF